@@ -1,5 +1,6 @@
 # from utils.punishments import handle_punishment
 # from utils.normalization import normalize
+# from utils.blacklist_matcher import BlacklistMatcher
 # from config.automod_config import *
 # import discord
 # from discord.ext import commands
@@ -86,8 +87,12 @@
 # # --------------------------
 # user_message_buffers: Dict[int, Deque[str]] = defaultdict(
 #     lambda: deque(maxlen=MAX_BUFFER))
-# user_sequence_buffers: Dict[int, Deque[str]] = defaultdict(
-#     lambda: deque(maxlen=MAX_BUFFER * SUBSTRING_MAX))
+# # Normalized text of recent messages, trimmed by slicing rather than one character at a time
+# user_sequence_buffers: Dict[int, str] = defaultdict(str)
+# # Last few letters of each user's stream, so a blacklisted word split across messages is caught
+# # while only the newest message is scanned
+# user_match_tails: Dict[int, str] = defaultdict(str)
+# user_flagged: Dict[int, bool] = {}
 # user_last_checked: Dict[int, float] = defaultdict(lambda: 0.0)
 # user_locks: Dict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
 # message_queue: asyncio.Queue = asyncio.Queue()
@@ -99,8 +104,8 @@
 
 # class BlacklistManagerCog(commands.Cog):
 #     @property
-#     def compiled_patterns(self) -> List[re.Pattern]:
-#         return []
+#     def matcher(self) -> BlacklistMatcher:
+#         return BlacklistMatcher()
 
 
 # class ModerationCog(commands.Cog):
@@ -183,21 +188,20 @@
 #         if len(content) > 1000:
 #             content = content[:1000] + "..."
 
-#         # Raw buffer (for regex across raw concatenation)
+#         # Raw buffer (for finding the offending messages to delete)
 #         user_message_buffers[user_id].append(content)
 
-#         # Normalized sequence buffer (for AI substring scanning / split-message detection)
-#         normalized = normalize(content)
-#         seq_buffer = user_sequence_buffers[user_id]
-#         seq_buffer.extend(normalized)
+#         # Blacklist scan, continued from where the user's previous message left off
+#         if self.blacklist_cog and hasattr(self.blacklist_cog, 'matcher'):
+#             match, user_match_tails[user_id] = self.blacklist_cog.matcher.feed(
+#                 content, user_match_tails[user_id])
+#             if match:
+#                 user_flagged[user_id] = True
 
-#         # Efficient size management
+#         # Normalized sequence buffer (for AI substring scanning)
 #         max_size = MAX_BUFFER * SUBSTRING_MAX
-#         while len(seq_buffer) > max_size:
-#             # Remove oldest 25% when over limit
-#             remove_count = max_size // 4
-#             for _ in range(min(remove_count, len(seq_buffer))):
-#                 seq_buffer.popleft()
+#         user_sequence_buffers[user_id] = (
+#             user_sequence_buffers[user_id] + normalize(content))[-max_size:]
 
 #         return list(user_message_buffers[user_id])
 
@@ -205,14 +209,11 @@
 #     # Centralized regex check against raw combined text
 #     # ----------------------
 #     def regex_check(self, raw_text: str) -> bool:
-#         if not self.blacklist_cog or not hasattr(self.blacklist_cog, 'compiled_patterns'):
+#         if not self.blacklist_cog or not hasattr(self.blacklist_cog, 'matcher'):
 #             return False
 #         try:
-#             # Use getattr to safely access the property
-#             patterns = getattr(self.blacklist_cog, 'compiled_patterns', [])
-#             for pat in patterns:
-#                 if pat.search(raw_text):
-#                     return True
+#             # Every static pattern and dynamic word is searched for in one pass
+#             return self.blacklist_cog.matcher.search(raw_text) is not None
 #         except Exception as e:
 #             print(f"Regex check error: {e}")
 #         return False
@@ -308,13 +309,16 @@
 #     async def process_user_buffer(self, user_id: int, message: discord.Message):
 #         now = time.time()
 
-#         # Increased cooldown and minimum message requirement
-#         if now - user_processing_times[user_id] < 30:
-#             return
+#         # A blacklist hit is acted on straight away; the AI check keeps its cooldown
+#         regex_flagged = user_flagged.pop(user_id, False)
+#         if not regex_flagged:
+#             # Increased cooldown and minimum message requirement
+#             if now - user_processing_times[user_id] < 30:
+#                 return
 
-#         # Only process if user has sent enough messages
-#         if len(user_message_buffers[user_id]) < 2:
-#             return
+#             # Only process if user has sent enough messages
+#             if len(user_message_buffers[user_id]) < 2:
+#                 return
 
 #         user_processing_times[user_id] = now
 
@@ -324,16 +328,9 @@
 #                 if not messages:
 #                     return
 
-#                 # Combined raw text (for regex across actual characters & separators)
-#                 combined_raw = " ".join(messages)
-
-#                 # Quick regex gate: if any hard pattern matches raw, it's flagged
-#                 regex_flagged = self.regex_check(combined_raw)
-
 #                 ai_flagged = False
 #                 if not regex_flagged:
-#                     combined_normalized = "".join(
-#                         user_sequence_buffers[user_id])
+#                     combined_normalized = user_sequence_buffers[user_id]
 #                     if len(combined_normalized) >= SUBSTRING_MIN:
 #                         # Check with optimized AI/rule-based method
 #                         ai_flagged = self.ai_classify(combined_normalized)
@@ -358,7 +355,8 @@
 
 #                 # Clear buffers
 #                 user_message_buffers[user_id].clear()
-#                 user_sequence_buffers[user_id].clear()
+#                 user_sequence_buffers.pop(user_id, None)
+#                 user_match_tails.pop(user_id, None)
 
 #                 # Handle punishment via Moderation cog
 #                 if isinstance(message.author, Member) and message.guild is not None:
@@ -385,7 +383,8 @@
 #             print(f"Error processing buffer for user {user_id}: {e}")
 #             # Clear buffers to prevent stuck state
 #             user_message_buffers[user_id].clear()
-#             user_sequence_buffers[user_id].clear()
+#             user_sequence_buffers.pop(user_id, None)
+#             user_match_tails.pop(user_id, None)
 
 #     # ----------------------
 #     # Cleanup buffer for inactive users
@@ -404,6 +403,8 @@
 #                 for uid in inactive_users:
 #                     user_message_buffers.pop(uid, None)
 #                     user_sequence_buffers.pop(uid, None)
+#                     user_match_tails.pop(uid, None)
+#                     user_flagged.pop(uid, None)
 #                     user_last_checked.pop(uid, None)
 #                     user_locks.pop(uid, None)
 #                     user_processing_times.pop(uid, None)
@@ -463,7 +464,7 @@
 #         self.add_message(user_id, message.content)
 
 #         now = time.time()
-#         if now - user_last_checked[user_id] >= USER_COOLDOWN:
+#         if user_flagged.get(user_id) or now - user_last_checked[user_id] >= USER_COOLDOWN:
 #             user_last_checked[user_id] = now
 #             if MEGA_SERVER_MODE:
 #                 await self.queue_message(message)
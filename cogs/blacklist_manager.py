@@ -6,7 +6,7 @@
 #     save_dynamic_word,
 #     remove_dynamic_word,
 #     list_dynamic_words,
-#     compile_blacklist_patterns,
+#     build_blacklist_matcher,
 # )
 
 
@@ -18,17 +18,17 @@
 
 #     def __init__(self, bot: commands.Bot):
 #         self.bot = bot
-#         self._compiled_patterns = compile_blacklist_patterns()
+#         self._matcher = build_blacklist_matcher()
 
 #     # -----------------------------
 #     # Helpers for AutoMod
 #     # -----------------------------
 #     @property
-#     def compiled_patterns(self):
-#         return self._compiled_patterns
+#     def matcher(self):
+#         return self._matcher
 
 #     def refresh_patterns(self):
-#         self._compiled_patterns = compile_blacklist_patterns()
+#         self._matcher = build_blacklist_matcher()
 
 #     # -----------------------------
 #     # Slash Commands
@@ -1,22 +1,33 @@
 """
 This cog will run the moderation commands like warn, mute, timeout, kick, ban
 """
+import asyncio
 import datetime
 import logging
 import io
 from collections import Counter
-from typing import Callable, Tuple
+from typing import Awaitable, Callable, Tuple
 
 import discord
 from discord.ext import commands
 from discord import app_commands, Embed
 from discord.ui import View, Button
-from sqlalchemy import select
+from sqlalchemy import select, delete
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 
-from database.database import async_session, Infraction, ModLogChannel, ExcludedChannel
+from database.database import async_session, Infraction, ModLogChannel, ExcludedChannel, LockdownSnapshot
+from utils.concurrency import gather_bounded
+from utils.member_index import MemberNameIndex
+from utils.schedule_grammar import parse_loose_duration_to_seconds
 
 logger = logging.getLogger("morrible")
 
+# Channels edited at once by /lockdown and /unlock; discord.py waits out any rate limits per channel
+LOCKDOWN_CONCURRENCY = 5
+
+# How long /kick waits for the farewell DM before removing the member anyway (well inside the 3s interaction deadline)
+KICK_DM_TIMEOUT = 2
+
 ROLE_HIERARCHY = {
     "the good witch": 4,
     "the wicked witch": 4,
@@ -48,31 +59,9 @@ def require_role(min_level: int):
 
 
 def parse_duration(duration_str: str) -> datetime.timedelta | None:
-    """Parses a duration string (e.g., 1h30m) into a timedelta object."""
-
-    import re
-    pattern = re.compile(r"(\d+)([smhd])")
-    matches = pattern.findall(duration_str.lower())
-
-    if not matches:
-        return None
-
-    total_seconds = 0
-    for amount, unit in matches:
-        amount = int(amount)
-        if unit == "s":
-            total_seconds += amount
-
-        elif unit == "m":
-            total_seconds += amount * 60
-
-        elif unit == "h":
-            total_seconds += amount * 3600
-
-        elif unit == "d":
-            total_seconds += amount * 86400
-
-    return datetime.timedelta(seconds=total_seconds)
+    """Parses a duration string (e.g., 1h30m, 30min, 2hours) into a timedelta object. "0s" is allowed, for clearing slowmode."""
+    seconds = parse_loose_duration_to_seconds(duration_str)
+    return datetime.timedelta(seconds=seconds) if seconds is not None else None
 
 
 def get_highest_role_level(user: discord.Member | discord.User) -> int:
@@ -230,6 +219,116 @@ class PaginatedEmbedView(View):
 class Moderation(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
+        self.member_index = MemberNameIndex()
+        self._background_tasks: set[asyncio.Task] = set()
+
+    async def cog_load(self):
+        # Guilds that are already cached (e.g. when the cog is reloaded) won't fire guild_available again
+        for guild in self.bot.guilds:
+            self.member_index.build(guild)
+
+    def cog_unload(self):
+        for task in self._background_tasks:
+            task.cancel()
+
+    def _spawn(self, coro: Awaitable) -> asyncio.Task:
+        """Runs a coroutine in the background, keeping a reference until it finishes."""
+        task = asyncio.ensure_future(coro)
+        self._background_tasks.add(task)
+        task.add_done_callback(self._background_tasks.discard)
+        return task
+
+    async def _run_side_effects(
+        self,
+        interaction: discord.Interaction,
+        member: discord.Member,
+        *,
+        action: str,
+        reason: str,
+        dm: Awaitable | None = None,
+        dm_failed_message: str = None,
+        duration: str = None,
+        duration_seconds: int = None
+    ):
+        """
+        Delivers the DM, infraction record and mod log of an action the moderator has already been answered for.
+        The DM and the infraction write run concurrently; the mod log goes out last so it can report their failures.
+        """
+
+        async def record():
+            await save_infraction(
+                user_id=member.id,
+                moderator_id=interaction.user.id,
+                infraction_type=action.lower(),
+                reason=reason,
+                duration_seconds=duration_seconds
+            )
+
+        async def no_dm():
+            return None
+
+        dm_result, infraction_result = await asyncio.gather(dm or no_dm(), record(), return_exceptions=True)
+
+        notes = []
+        if isinstance(dm_result, discord.Forbidden):
+            notes.append("The member could not be notified (DMs closed).")
+        elif isinstance(dm_result, BaseException):
+            logger.error("Failed to DM %s about %s: %s", member.id, action, dm_result)
+            notes.append("The member could not be notified.")
+
+        if isinstance(infraction_result, BaseException):
+            logger.error("Failed to record %s infraction for %s: %s", action, member.id, infraction_result)
+            notes.append("The infraction could not be recorded.")
+
+        try:
+            await send_mod_log(self.bot, interaction.guild, action, interaction.user, member, reason,
+                               duration=duration, extra="\n".join(notes) or None)
+        except Exception as e:
+            logger.error("Failed to send %s mod log for %s: %s", action, member.id, e)
+
+        try:
+            if isinstance(dm_result, BaseException) and dm_failed_message:
+                await interaction.followup.send(dm_failed_message)
+            if isinstance(infraction_result, BaseException):
+                await interaction.followup.send("Alas, this little... *episode*... could not be entered into the record. Do try again.", ephemeral=True)
+        except discord.HTTPException as e:
+            logger.error("Failed to report %s side-effect failures to moderator: %s", action, e)
+
+    # Member name index maintenance
+
+    @commands.Cog.listener()
+    async def on_guild_available(self, guild: discord.Guild):
+        self.member_index.build(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_join(self, guild: discord.Guild):
+        self.member_index.build(guild)
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        self.member_index.drop_guild(guild.id)
+
+    @commands.Cog.listener()
+    async def on_member_join(self, member: discord.Member):
+        self.member_index.add(member)
+
+    @commands.Cog.listener()
+    async def on_member_update(self, before: discord.Member, after: discord.Member):
+        if before.nick != after.nick:
+            self.member_index.add(after)
+
+    @commands.Cog.listener()
+    async def on_user_update(self, before: discord.User, after: discord.User):
+        if before.name == after.name and before.global_name == after.global_name:
+            return
+        for guild in after.mutual_guilds:
+            member = guild.get_member(after.id)
+            if member:
+                self.member_index.add(member)
+
+    @commands.Cog.listener()
+    async def on_member_remove(self, member: discord.Member):
+        self.member_index.remove(member.guild.id, member.id)
 
     # Warn a member
 
@@ -255,21 +354,16 @@ class Moderation(commands.Cog):
         if issuer_level <= target_level:
             return await interaction.response.send_message("One must know their place, darling. You cannot warn those of equal or greater importance.", ephemeral=False)
 
-        try:
-            await member.send(f"A little birdie has whispered a warning in your ear, {member.mention}, for: {reason}")
-            await interaction.response.send_message(f"A little birdie has whispered a warning in {member.mention}'s ear. Let's hope they listen.", ephemeral=False)
-
-            await save_infraction(
-                user_id=member.id,
-                moderator_id=interaction.user.id,
-                infraction_type="warn",
-                reason=reason
-            )
-
-            await send_mod_log(self.bot, interaction.guild, "Warn", interaction.user, member, reason)
+        await interaction.response.send_message(f"A little birdie has whispered a warning in {member.mention}'s ear. Let's hope they listen.", ephemeral=False)
 
-        except discord.Forbidden:
-            await interaction.response.send_message(f"It seems {member.mention} has shut themselves away from my... *guidance*. How unfortunate for them.", ephemeral=False)
+        self._spawn(self._run_side_effects(
+            interaction,
+            member,
+            action="Warn",
+            reason=reason,
+            dm=member.send(f"A little birdie has whispered a warning in your ear, {member.mention}, for: {reason}"),
+            dm_failed_message=f"It seems {member.mention} has shut themselves away from my... *guidance*. How unfortunate for them."
+        ))
 
     # Kick a member
 
@@ -294,23 +388,36 @@ class Moderation(commands.Cog):
         if issuer_level <= target_level:
             return await interaction.response.send_message("One must respect the hierarchy of talent, my dear. You cannot kick your equals or superiors.", ephemeral=False)
 
-        try:
-            await member.send(f"You have been... *escorted* from our presence, {member.mention}, for: {reason}")
-            await member.kick(reason=f"Kicked by {interaction.user} for: {reason}")
-            await interaction.response.send_message(f"{member.mention} has been... *escorted* from our presence. A necessary, if unpleasant, business.", ephemeral=False)
-            await save_infraction(
-                user_id=member.id,
-                moderator_id=interaction.user.id,
-                infraction_type="kick",
-                reason=reason
-            )
+        # Waiting on the DM and the kick together can outlast the 3s interaction deadline
+        await interaction.response.defer(thinking=False)
 
-            await send_mod_log(self.bot, interaction.guild, "Kick", interaction.user, member, reason)
+        # The DM has to land before the kick removes our shared server, but a slow one must not hold the kick up
+        dm_task = asyncio.ensure_future(member.send(f"You have been... *escorted* from our presence, {member.mention}, for: {reason}"))
+        await asyncio.wait({dm_task}, timeout=KICK_DM_TIMEOUT)
 
-        except discord.Forbidden:
-            await interaction.response.send_message("Alas, my influence does not extend to this... *particular* individual. A pity.", ephemeral=True)
+        try:
+            await member.kick(reason=f"Kicked by {interaction.user} for: {reason}")
         except Exception as e:
-            await interaction.response.send_message(f"A most unexpected and *dreadful* complication has arisen: {str(e)}", ephemeral=True)
+            await self._retract_dm(dm_task)
+            if isinstance(e, discord.Forbidden):
+                return await interaction.followup.send("Alas, my influence does not extend to this... *particular* individual. A pity.", ephemeral=True)
+            return await interaction.followup.send(f"A most unexpected and *dreadful* complication has arisen: {str(e)}", ephemeral=True)
+
+        await interaction.followup.send(f"{member.mention} has been... *escorted* from our presence. A necessary, if unpleasant, business.")
+        self._spawn(self._run_side_effects(interaction, member, action="Kick", reason=reason, dm=dm_task))
+
+    @staticmethod
+    async def _retract_dm(dm_task: asyncio.Future):
+        """Withdraws a notice DM for an action that didn't go through, or stops it being sent."""
+        if not dm_task.done():
+            dm_task.cancel()
+            return
+        if dm_task.cancelled() or dm_task.exception() is not None:
+            return
+        try:
+            await dm_task.result().delete()
+        except discord.HTTPException:
+            pass
 
     # Ban a member
 
@@ -548,19 +655,17 @@ class Moderation(commands.Cog):
         try:
             await member.timeout(until, reason=reason)
             await interaction.followup.send(f"{member.mention} has been placed in a state of... *quiet contemplation* for {duration}. A moment to reflect on their choices.")
-            try:
-                await member.send(f"You have been placed in a state of... *quiet contemplation* in {interaction.guild.name} for {duration}. Reason: {reason}")
-                await save_infraction(
-                    user_id=member.id,
-                    moderator_id=interaction.user.id,
-                    infraction_type="timeout",
-                    reason=reason,
-                    duration_seconds=int(delta.total_seconds())
-                )
-                await send_mod_log(self.bot, interaction.guild, "Timeout", interaction.user, member, reason, duration=duration)
 
-            except discord.Forbidden:
-                await interaction.followup.send("The little dear has closed their ears to me. They will discover their predicament soon enough.")
+            self._spawn(self._run_side_effects(
+                interaction,
+                member,
+                action="Timeout",
+                reason=reason,
+                dm=member.send(f"You have been placed in a state of... *quiet contemplation* in {interaction.guild.name} for {duration}. Reason: {reason}"),
+                dm_failed_message="The little dear has closed their ears to me. They will discover their predicament soon enough.",
+                duration=duration,
+                duration_seconds=int(delta.total_seconds())
+            ))
         except discord.Forbidden:
             await interaction.followup.send("This one, it seems, is immune to my... silencing charms. A pity.", ephemeral=True)
         except Exception as e:
@@ -776,13 +881,8 @@ class Moderation(commands.Cog):
                         pass
 
             if not target_user:
-                # Search by username, global_name, or nickname in members list
-                target_user = discord.utils.find(
-                    lambda m: m.name.lower() == member.lower() or
-                              (m.nick and m.nick.lower() == member.lower()) or
-                              (getattr(m, 'global_name', None) and m.global_name.lower() == member.lower()),
-                    guild.members
-                )
+                # Search by username, global_name, or nickname in the member name index
+                target_user = self.member_index.resolve(guild, member)
 
             if not target_user:
                 return await interaction.followup.send(
@@ -915,6 +1015,17 @@ class Moderation(commands.Cog):
                 extra=extra_details
             )
 
+    @purge.autocomplete("member")
+    async def purge_member_autocomplete(self, interaction: discord.Interaction, current: str) -> list[app_commands.Choice[str]]:
+        """Suggests members whose username, nickname or global name starts with the typed text."""
+        if interaction.guild is None or not current:
+            return []
+
+        return [
+            app_commands.Choice(name=f"{m.display_name} (@{m.name})"[:100], value=str(m.id))
+            for m in self.member_index.complete(interaction.guild, current)
+        ]
+
     # Slowmode
 
     @app_commands.command(name="slowmode", description="Set slowmode in a channel")
@@ -951,6 +1062,172 @@ class Moderation(commands.Cog):
         except Exception as e:
             await interaction.response.send_message(f"A most disorderly error has occurred: {str(e)}", ephemeral=True)
 
+    # Lockdown
+
+    @app_commands.command(name="lockdown", description="Lock every text channel in the server")
+    @app_commands.describe(
+        slowmode="Apply this slowmode instead of stopping messages entirely (e.g. 30s, 5m)",
+        reason="Reason for the lockdown"
+    )
+    @app_commands.guild_only()
+    @app_commands.guild_install()
+    @require_role(4)
+    async def lockdown(self, interaction: discord.Interaction, slowmode: str = None, reason: str = None):
+        """Snapshots every text channel's @everyone overwrite and slowmode, then locks them all."""
+        guild = interaction.guild
+
+        delay_seconds = None
+        if slowmode:
+            delta = parse_duration(slowmode)
+            if delta is None:
+                return await interaction.response.send_message("Such a clumsy way with time. The duration must be specified with... *elegance*. `10s`, `5m`, `1h30m`, and so on.")
+            delay_seconds = int(delta.total_seconds())
+            if delay_seconds < 0 or delay_seconds > 21600:
+                return await interaction.response.send_message("Even patience has its limits, my dear. The slowmode must be between a fleeting moment and a six-hour eternity.")
+
+        await interaction.response.defer()
+
+        async with async_session() as session:
+            result = await session.execute(
+                select(LockdownSnapshot.channel_id).where(LockdownSnapshot.guild_id == guild.id).limit(1)
+            )
+            if result.first():
+                return await interaction.followup.send("The doors are already bolted, my dear. Use `/unlock` before you lock them again.")
+
+        everyone = guild.default_role
+        channels = [ch for ch in guild.text_channels if ch.permissions_for(guild.me).manage_channels]
+
+        snapshots = []
+        for ch in channels:
+            overwrite = ch.overwrites.get(everyone)
+            allow, deny = overwrite.pair() if overwrite is not None else (discord.Permissions(), discord.Permissions())
+            snapshots.append({
+                "guild_id": guild.id,
+                "channel_id": ch.id,
+                "has_overwrite": overwrite is not None,
+                "overwrite_allow": allow.value,
+                "overwrite_deny": deny.value,
+                "slowmode_delay": ch.slowmode_delay,
+            })
+
+        if snapshots:
+            # A concurrent /lockdown may have saved these channels first; its snapshot predates both locks, so it wins
+            async with async_session() as session:
+                result = await session.execute(
+                    sqlite_insert(LockdownSnapshot).values(snapshots).on_conflict_do_nothing(
+                        index_elements=["guild_id", "channel_id"]
+                    )
+                )
+                await session.commit()
+            if result.rowcount == 0:
+                return await interaction.followup.send("The doors are already bolted, my dear. Use `/unlock` before you lock them again.")
+
+        audit_reason = f"Lockdown by {interaction.user}" + (f": {reason}" if reason else "")
+
+        async def lock(ch: discord.TextChannel):
+            if delay_seconds is not None:
+                await ch.edit(slowmode_delay=delay_seconds, reason=audit_reason)
+                return
+
+            overwrites = ch.overwrites
+            overwrite = ch.overwrites_for(everyone)
+            overwrite.update(send_messages=False, send_messages_in_threads=False,
+                             create_public_threads=False, add_reactions=False)
+            overwrites[everyone] = overwrite
+            await ch.edit(overwrites=overwrites, reason=audit_reason)
+
+        results = await gather_bounded(channels, lock, LOCKDOWN_CONCURRENCY)
+        failed = [ch for ch, res in zip(channels, results) if isinstance(res, BaseException)]
+        for ch, res in zip(channels, results):
+            if isinstance(res, BaseException):
+                logger.error("Failed to lock channel %s in guild %s: %s", ch.id, guild.id, res)
+
+        locked_count = len(channels) - len(failed)
+        mode = f"a `{slowmode}` slowmode" if delay_seconds is not None else "silence"
+        message = f"The curtain has come down. {locked_count} channels have been placed under {mode} until I say otherwise."
+        if failed:
+            message += f"\n{len(failed)} channels resisted my... *influence*: " + ", ".join(ch.mention for ch in failed[:20])
+        await interaction.followup.send(message)
+
+        await send_mod_log(
+            self.bot,
+            guild,
+            action="Lockdown",
+            moderator=interaction.user,
+            reason=reason,
+            extra=f"Locked {locked_count} channels with {mode} ({len(failed)} failed)"
+        )
+
+    @app_commands.command(name="unlock", description="Restore every channel locked by /lockdown")
+    @app_commands.describe(reason="Reason for lifting the lockdown")
+    @app_commands.guild_only()
+    @app_commands.guild_install()
+    @require_role(4)
+    async def unlock(self, interaction: discord.Interaction, reason: str = None):
+        """Restores the @everyone overwrites and slowmode saved by the last lockdown."""
+        guild = interaction.guild
+        await interaction.response.defer()
+
+        async with async_session() as session:
+            result = await session.execute(
+                select(LockdownSnapshot).where(LockdownSnapshot.guild_id == guild.id)
+            )
+            snapshots = result.scalars().all()
+
+        if not snapshots:
+            return await interaction.followup.send("There is nothing to unlock, my dear. The doors are wide open.")
+
+        everyone = guild.default_role
+        audit_reason = f"Lockdown lifted by {interaction.user}" + (f": {reason}" if reason else "")
+
+        async def restore(snapshot: LockdownSnapshot):
+            ch = guild.get_channel(snapshot.channel_id)
+            if ch is None:
+                return  # Channel was deleted during the lockdown
+
+            overwrites = ch.overwrites
+            if snapshot.has_overwrite:
+                overwrites[everyone] = discord.PermissionOverwrite.from_pair(
+                    discord.Permissions(snapshot.overwrite_allow), discord.Permissions(snapshot.overwrite_deny)
+                )
+            else:
+                overwrites.pop(everyone, None)
+            await ch.edit(overwrites=overwrites, slowmode_delay=snapshot.slowmode_delay, reason=audit_reason)
+
+        results = await gather_bounded(snapshots, restore, LOCKDOWN_CONCURRENCY)
+        restored_ids = []
+        failed_ids = []
+        for snapshot, res in zip(snapshots, results):
+            if isinstance(res, BaseException):
+                failed_ids.append(snapshot.channel_id)
+                logger.error("Failed to restore channel %s in guild %s: %s", snapshot.channel_id, guild.id, res)
+            else:
+                restored_ids.append(snapshot.channel_id)
+
+        # Failed channels keep their snapshot so a second /unlock can retry them
+        async with async_session() as session:
+            await session.execute(
+                delete(LockdownSnapshot).where(
+                    LockdownSnapshot.guild_id == guild.id,
+                    LockdownSnapshot.channel_id.in_(restored_ids)
+                )
+            )
+            await session.commit()
+
+        message = f"The curtain rises once more. {len(restored_ids)} channels have been restored to their former... *liveliness*."
+        if failed_ids:
+            message += f"\n{len(failed_ids)} channels could not be restored. Run `/unlock` again to retry them."
+        await interaction.followup.send(message)
+
+        await send_mod_log(
+            self.bot,
+            guild,
+            action="Unlock",
+            moderator=interaction.user,
+            reason=reason,
+            extra=f"Restored {len(restored_ids)} channels ({len(failed_ids)} failed)"
+        )
+
     # Mute
 
     @app_commands.command(name="mute", description="Bestow silence upon a misbehaving soul.")
@@ -983,17 +1260,16 @@ class Moderation(commands.Cog):
 
         try:
             await member.add_roles(muted_role)
-            await member.send(f"A hush has fallen, {member.mention}. You have been... *silenced* for: {reason}")
             await interaction.response.send_message(f"Let a hush fall over {member.mention}. They have been... *silenced*. A consequence of their own making, of course.")
-            await save_infraction(
-                user_id=member.id,
-                moderator_id=interaction.user.id,
-                infraction_type="mute",
-                reason=reason
-            )
 
-            # Moderation log
-            await send_mod_log(self.bot, interaction.guild, "Mute", interaction.user, member, reason)
+            self._spawn(self._run_side_effects(
+                interaction,
+                member,
+                action="Mute",
+                reason=reason,
+                dm=member.send(f"A hush has fallen, {member.mention}. You have been... *silenced* for: {reason}"),
+                dm_failed_message="Their ears are closed to me, but the silence will speak for itself."
+            ))
         except discord.Forbidden:
             await interaction.response.send_message("This one's voice, it seems, is beyond my control. How... disappointing.")
         except Exception as e:
@@ -1,8 +1,62 @@
 from discord.ext import commands
 from discord import app_commands, Interaction, ui, TextChannel
+import asyncio
 import discord
+import logging
 from sqlalchemy.future import select
-from database.database import TicketChannel, PartnershipTicket, PartnershipLogChannel, async_session
+from database.database import TicketChannel, PartnershipTicket, PartnershipLogChannel, PartnershipStaffRole, async_session
+from cogs.moderation import role_level
+from utils.concurrency import gather_bounded
+from utils.transcripts import archive_and_delete
+
+logger = logging.getLogger("morrible")
+
+# Roles ranked moderator or above are always staff, alongside the roles set with /partnerstaffrole
+STAFF_ROLE_LEVEL = 2
+
+# thread.add_user calls in flight when staff can't be brought in by a mention
+STAFF_ADD_CONCURRENCY = 5
+
+
+async def add_staff(thread: discord.Thread, guild: discord.Guild, roles: list[discord.Role]):
+    """
+    Brings the staff `roles` and the owner into a private ticket thread. Mentioning a role adds all of its members
+    at once, so members are only added one by one for roles the bot may not mention, or if the mention fails.
+    """
+    can_mention_any = guild.me is not None and thread.permissions_for(guild.me).mention_everyone
+    mentionable = [role for role in roles if can_mention_any or role.mentionable]
+    unmentionable = [role for role in roles if role not in mentionable]
+
+    mentions = [role.mention for role in mentionable]
+    users = []
+    if guild.owner_id:
+        mentions.append(f"<@{guild.owner_id}>")
+        users.append(discord.Object(guild.owner_id))
+
+    try:
+        # Mentions added by an edit bring their members into the thread without pinging anyone
+        message = await thread.send("*Summoning my staff...*", allowed_mentions=discord.AllowedMentions.none())
+        await message.edit(
+            content=f"*My staff has been summoned:* {' '.join(mentions)}",
+            allowed_mentions=discord.AllowedMentions(roles=mentionable, users=users)
+        )
+    except discord.HTTPException as e:
+        logger.warning(f"Failed to mention staff into ticket {thread.id}, adding them individually: {e}")
+        unmentionable = roles
+        owner = guild.owner
+    else:
+        owner = None
+
+    members = {member.id: member for role in unmentionable for member in role.members}
+    if owner:
+        members[owner.id] = owner
+    if not members:
+        return
+
+    results = await gather_bounded(members.values(), thread.add_user, STAFF_ADD_CONCURRENCY)
+    failures = sum(isinstance(result, BaseException) for result in results)
+    if failures:
+        logger.warning(f"Failed to add {failures} of {len(results)} staff members to ticket {thread.id}")
 
 
 class OpenTicketButton(ui.View):
@@ -18,10 +72,13 @@ class OpenTicketButton(ui.View):
         if guild is None:
             return await interaction.response.send_message("This command must be used in a server.", ephemeral=True)
 
+        # Acknowledge straight away; creating the thread and bringing in staff can outlast the 3s deadline
+        await interaction.response.defer(ephemeral=True, thinking=True)
+
         async with async_session() as session:
             config = await session.get(TicketChannel, guild.id)
             if not config:
-                return await interaction.response.send_message("❌ Ticket system is not set up. Ask an admin.", ephemeral=True)
+                return await interaction.followup.send("❌ Ticket system is not set up. Ask an admin.", ephemeral=True)
 
             result = await session.execute(
                 select(PartnershipTicket).where(
@@ -33,11 +90,11 @@ class OpenTicketButton(ui.View):
 
             existing_ticket = result.scalar()
             if existing_ticket:
-                return await interaction.response.send_message("Patience, my dear. You already have a ticket open. One simply cannot have *all* of my attention at once.", ephemeral=True)
+                return await interaction.followup.send("Patience, my dear. You already have a ticket open. One simply cannot have *all* of my attention at once.", ephemeral=True)
 
             base_channel = guild.get_channel(int(config.channel_id))
             if not base_channel or not isinstance(base_channel, TextChannel):
-                return await interaction.response.send_message("The designated place for such... *requests*... has vanished or is invalid. How utterly bizarre.", ephemeral=True)
+                return await interaction.followup.send("The designated place for such... *requests*... has vanished or is invalid. How utterly bizarre.", ephemeral=True)
 
             # Check bot permissions for creating private threads
             bot_member = guild.get_member(self.bot.user.id) or guild.me
@@ -50,38 +107,13 @@ class OpenTicketButton(ui.View):
             if bot_member:
                 perms = base_channel.permissions_for(bot_member)
                 if not (perms.create_private_threads or perms.manage_threads):
-                    return await interaction.response.send_message("I lack permissions to create private threads in the configured channel. Please grant `Create Private Threads` or `Manage Threads`.", ephemeral=True)
+                    return await interaction.followup.send("I lack permissions to create private threads in the configured channel. Please grant `Create Private Threads` or `Manage Threads`.", ephemeral=True)
             try:
                 thread = await base_channel.create_thread(name=f"ticket-{user.name}", type=discord.ChannelType.private_thread, invitable=False)
             except discord.Forbidden:
-                return await interaction.response.send_message("I cannot create a thread in the configured channel. Please check my permissions.", ephemeral=True)
+                return await interaction.followup.send("I cannot create a thread in the configured channel. Please check my permissions.", ephemeral=True)
             except discord.HTTPException as e:
-                return await interaction.response.send_message(f"Failed to create a ticket thread: {e}", ephemeral=True)
-
-            # Add staff to the thread
-            staff_role_ids = [
-                1308969673441677404,  # The Good Witch
-                1309910118703300649,  # The Wicked Witch
-                1365371606234435709,  # Madame Morrible
-                1413637333999419496,  # WickedBot
-                1441805657287430394,  # head mod
-                1309345855618416724,  # moderator
-            ]
-            for role_id in staff_role_ids:
-                role = guild.get_role(role_id)
-                if role:
-                    for member in role.members:
-                        try:
-                            await thread.add_user(member)
-                        except Exception:
-                            pass
-
-            # Add owner to the thread
-            if guild.owner:
-                try:
-                    await thread.add_user(guild.owner)
-                except Exception:
-                    pass
+                return await interaction.followup.send(f"Failed to create a ticket thread: {e}", ephemeral=True)
 
             new_ticket = PartnershipTicket(
                 guild_id=guild.id,
@@ -94,15 +126,64 @@ class OpenTicketButton(ui.View):
             except Exception:
                 await session.rollback()
                 await thread.delete()
-                return await interaction.response.send_message("Patience, my dear. You already have a ticket open. One simply cannot have *all* of my attention at once.", ephemeral=True)
+                return await interaction.followup.send("Patience, my dear. You already have a ticket open. One simply cannot have *all* of my attention at once.", ephemeral=True)
+
+        await thread.send(f"🎟️ {user.mention}, thank you for your interest in partnering. A staff member will respond shortly.")
+        await interaction.followup.send(f"✅ Your ticket has been created: {thread.mention}", ephemeral=True)
+
+        cog = self.bot.get_cog("PartnershipTickets")
+        await add_staff(thread, guild, cog.staff_roles(guild) if cog else [])
 
-            await thread.send(f"🎟️ {user.mention}, thank you for your interest in partnering. A staff member will respond shortly.")
-            await interaction.response.send_message(f"✅ Your ticket has been created: {thread.mention}", ephemeral=True)
+
+async def delete_ad(channel: discord.abc.GuildChannel | None, message_id: int) -> bool:
+    """Deletes a partner ad by ID without fetching it first. Returns whether the ad is gone."""
+    if not isinstance(channel, discord.TextChannel):
+        return False
+    try:
+        await channel.get_partial_message(message_id).delete()
+    except discord.NotFound:
+        pass
+    except discord.HTTPException as e:
+        logger.warning(f"Failed to delete partner ad {message_id}: {e}")
+        return False
+    return True
 
 
 class PartnershipTickets(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # Transcript jobs still running, held so they aren't garbage collected mid-archive
+        self._archive_tasks: set[asyncio.Task] = set()
+        # (guild_id, user_id) of every partner whose ad is still posted, so most leaves never touch the database
+        self.active_ads: set[tuple[int, int]] = set()
+        # guild_id -> role IDs set with /partnerstaffrole
+        self.staff_role_ids: dict[int, set[int]] = {}
+        # guild_id -> every staff role ID, rebuilt when the guild's roles or its staff roles change
+        self._staff_role_cache: dict[int, list[int]] = {}
+
+    async def cog_load(self):
+        async with async_session() as session:
+            result = await session.execute(
+                select(PartnershipTicket.guild_id, PartnershipTicket.user_id).where(
+                    PartnershipTicket.ad_message_id.isnot(None)
+                )
+            )
+            self.active_ads = {(guild_id, user_id) for guild_id, user_id in result.all()}
+
+            result = await session.execute(select(PartnershipStaffRole))
+            for row in result.scalars():
+                self.staff_role_ids.setdefault(row.guild_id, set()).add(row.role_id)
+
+    def staff_roles(self, guild: discord.Guild) -> list[discord.Role]:
+        role_ids = self._staff_role_cache.get(guild.id)
+        if role_ids is None:
+            configured = self.staff_role_ids.get(guild.id, set())
+            role_ids = [
+                role.id for role in guild.roles
+                if role.id in configured or role_level(role.name) >= STAFF_ROLE_LEVEL
+            ]
+            self._staff_role_cache[guild.id] = role_ids
+        return [role for role in map(guild.get_role, role_ids) if role]
 
     @app_commands.command(name="setticketchannel", description="Set the channel where tickets will be created and post ticket UI.")
     @app_commands.checks.has_permissions(administrator=True)
@@ -144,6 +225,31 @@ class PartnershipTickets(commands.Cog):
             await session.commit()
         await interaction.response.send_message(f"✅ Partnership log channel set to {channel.mention}.")
 
+    @app_commands.command(name="partnerstaffrole", description="Add or remove a role brought into every partnership ticket.")
+    @app_commands.describe(role="The role to add, or to remove if it is already staff")
+    @app_commands.checks.has_permissions(administrator=True)
+    @app_commands.guild_only()
+    @app_commands.guild_install()
+    async def partner_staff_role(self, interaction: discord.Interaction, role: discord.Role):
+        guild_id = interaction.guild.id
+        async with async_session() as session:
+            existing = await session.get(PartnershipStaffRole, (guild_id, role.id))
+            if existing:
+                await session.delete(existing)
+            else:
+                session.add(PartnershipStaffRole(guild_id=guild_id, role_id=role.id))
+            await session.commit()
+
+        configured = self.staff_role_ids.setdefault(guild_id, set())
+        if existing:
+            configured.discard(role.id)
+            message = f"Very well. {role.mention} shall no longer be summoned to partnership tickets."
+        else:
+            configured.add(role.id)
+            message = f"Splendid. {role.mention} shall attend every partnership ticket from now on."
+        self._staff_role_cache.pop(guild_id, None)
+        await interaction.response.send_message(message, ephemeral=True)
+
     @app_commands.command(name="partnerclose", description="Close the current ticket.")
     @app_commands.describe(server_name="Name of the server", server_link="Invite link to the server", accepted="Whether the partnership was accepted (true/false)", ad_message_id="Message ID of the partner ad (required if accepted)", description="Optional server description")
     @app_commands.checks.has_permissions(manage_channels=True)
@@ -159,6 +265,7 @@ class PartnershipTickets(commands.Cog):
         if accepted and not ad_message_id:
             return await interaction.response.send_message("❌ You must provide the ad message ID if the partnership was accepted.", ephemeral=True)
 
+        log_channel = None
         async with async_session() as session:
             result = await session.execute(
                 select(PartnershipTicket).where(
@@ -174,6 +281,8 @@ class PartnershipTickets(commands.Cog):
                 if accepted:
                     ticket.ad_message_id = int(ad_message_id)
                 await session.commit()
+                if accepted:
+                    self.active_ads.add((guild.id, ticket.user_id))
 
                 user = guild.get_member(ticket.user_id)
                 closer = interaction.user
@@ -204,9 +313,15 @@ class PartnershipTickets(commands.Cog):
                     log_channel = guild.get_channel(log_config.channel_id)
                     if log_channel and isinstance(log_channel, discord.TextChannel):
                         await log_channel.send(embed=embed)
-
+                    else:
+                        log_channel = None
+
+        # The transcript is archived and the thread deleted in the background
+        task = asyncio.create_task(archive_and_delete(
+            channel, f"partnership-{channel.id}", log_channel, f"Transcript of {channel.name}"))
+        self._archive_tasks.add(task)
+        task.add_done_callback(self._archive_tasks.discard)
         await interaction.response.send_message("✅ Ticket closed and deleted.", ephemeral=True)
-        await channel.delete()
 
     @app_commands.command(name="addpartner", description="Add a partner without opening a ticket.")
     @app_commands.describe(user="The user to add as partner", server_name="Name of the server", server_link="Invite link to the server", ad_message_id="Message ID of the partner ad", description="Optional server description")
@@ -245,6 +360,7 @@ class PartnershipTickets(commands.Cog):
             )
             session.add(new_partner)
             await session.commit()
+            self.active_ads.add((guild.id, user.id))
 
             # Create log embed
             embed = discord.Embed(
@@ -293,27 +409,25 @@ class PartnershipTickets(commands.Cog):
                     PartnershipTicket.ad_message_id.isnot(None)
                 )
             )
-            partner = result.scalar()
+            partners = result.scalars().all()
 
-            if not partner:
+            if not partners:
                 return await interaction.response.send_message("❌ No active partnership found for this user.", ephemeral=True)
 
+            partner = partners[0]
             ad_message_id = partner.ad_message_id
 
             # Delete the partnership record
             await session.delete(partner)
             await session.commit()
+            # Their other ads still need deleting if they leave
+            if len(partners) == 1:
+                self.active_ads.discard((guild.id, user.id))
 
             # Try to delete the ad message
-            try:
-                log_config = await session.get(PartnershipLogChannel, guild.id)
-                if log_config and log_config.channel_id:
-                    log_channel = guild.get_channel(log_config.channel_id)
-                    if log_channel and isinstance(log_channel, discord.TextChannel):
-                        ad_message = await log_channel.fetch_message(ad_message_id)
-                        await ad_message.delete()
-            except Exception as e:
-                print(f"Failed to delete ad message: {e}")
+            log_config = await session.get(PartnershipLogChannel, guild.id)
+            if log_config and log_config.channel_id:
+                await delete_ad(guild.get_channel(log_config.channel_id), ad_message_id)
 
             # Create log embed
             embed = discord.Embed(
@@ -338,39 +452,55 @@ class PartnershipTickets(commands.Cog):
 
         await interaction.response.send_message(f"✅ Successfully removed {user.mention} as a partner and deleted their ad.", ephemeral=True)
 
+    # Staff role cache maintenance
+
+    @commands.Cog.listener()
+    async def on_guild_role_create(self, role: discord.Role):
+        self._staff_role_cache.pop(role.guild.id, None)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        self._staff_role_cache.pop(role.guild.id, None)
+
+    @commands.Cog.listener()
+    async def on_guild_role_update(self, before: discord.Role, after: discord.Role):
+        if before.name != after.name:
+            self._staff_role_cache.pop(after.guild.id, None)
+
     @commands.Cog.listener()
     async def on_member_remove(self, member: discord.Member):
+        key = (member.guild.id, member.id)
+        if key not in self.active_ads:
+            return
+
         async with async_session() as session:
             result = await session.execute(
                 select(PartnershipTicket).where(
+                    PartnershipTicket.guild_id == member.guild.id,
                     PartnershipTicket.user_id == member.id,
                     PartnershipTicket.ad_message_id.isnot(None)
                 )
             )
             tickets = result.scalars().all()
 
-            for ticket in tickets:
-                try:
-                    log_config = await session.get(PartnershipLogChannel, member.guild.id)
-                    if not log_config:
-                        continue
-
-                    log_channel = member.guild.get_channel(
-                        log_config.channel_id)
-                    if not log_channel:
-                        continue
-
-                    ad_message = await log_channel.fetch_message(ticket.ad_message_id)
-                    await ad_message.delete()
+            log_config = await session.get(PartnershipLogChannel, member.guild.id)
+            if not log_config:
+                return
+            log_channel = member.guild.get_channel(log_config.channel_id)
+            if not log_channel:
+                return
 
+            ads_left = False
+            for ticket in tickets:
+                if await delete_ad(log_channel, ticket.ad_message_id):
                     # Remove the partnership record
                     await session.delete(ticket)
-
-                except Exception as e:
-                    print(
-                        f"Failed to delete ad message for leaving member: {e}")
+                else:
+                    ads_left = True
 
             await session.commit()
+            if not ads_left:
+                self.active_ads.discard(key)
 
 
 async def setup(bot: commands.Bot):
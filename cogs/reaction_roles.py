@@ -2,12 +2,38 @@ import discord
 from discord.ext import commands
 from discord import app_commands
 
+import asyncio
+import datetime
 import json
-from typing import Dict
+import logging
+import re
+import time
+from collections import defaultdict
+from typing import Dict, Literal, NamedTuple
 from pathlib import Path
 
+from sqlalchemy import select, update
+
+from database.database import async_session, ReactionRole, PanelRole
+from utils.concurrency import RateLimiter, gather_bounded
+from utils.member_resolver import MemberResolver
+from utils.role_edits import RoleEditQueue
+
+logger = logging.getLogger("morrible")
+
+# Legacy store, imported into the database once and then renamed
 DATA_FILE = Path("database/reaction_roles.json")
 
+# How long mapping changes are gathered before they are written in one transaction
+WRITE_DEBOUNCE_SECONDS = 2
+
+# Guilds reconciled more recently than this are skipped by the startup pass, so a restart resumes it
+RECONCILE_FRESH_FOR = datetime.timedelta(hours=1)
+
+# Role edits per second made while reconciling, and members being edited at once
+RECONCILE_EDIT_RATE = 2
+RECONCILE_CONCURRENCY = 4
+
 
 def load_reaction_roles() -> Dict[int, Dict[str, int]]:
     if not DATA_FILE.exists():
@@ -21,27 +47,363 @@ def load_reaction_roles() -> Dict[int, Dict[str, int]]:
         return {}
 
 
-def save_reaction_roles(data: Dict[int, Dict[str, int]]):
-    DATA_FILE.parent.mkdir(parents=True, exist_ok=True)
-    with DATA_FILE.open("w", encoding="utf-8") as f:
-        json.dump(data, f, indent=4)
+async def apply_panel_roles(interaction: discord.Interaction, changes: Dict[int, bool]):
+    """Gives or takes self-roles chosen on a panel with a single edit, then tells the member what changed."""
+    member = interaction.user
+    roles = [interaction.guild.get_role(role_id) for role_id in changes]
+    if not isinstance(member, discord.Member) or any(role is None or not role.is_assignable() for role in roles):
+        return await interaction.response.send_message(
+            "That role is beyond my reach, I'm afraid. Do let the staff know.", ephemeral=True
+        )
+
+    await interaction.response.defer(ephemeral=True, thinking=True)
+    cog = interaction.client.get_cog("ReactionRoles")
+    try:
+        await cog.role_edits.apply_changes(member, changes, reason="Self-role panel.")
+    except discord.HTTPException:
+        return await interaction.followup.send(
+            "Something went awry and your roles are just as they were, my dear. Do try again in a moment.", ephemeral=True
+        )
+
+    given = [f"<@&{role_id}>" for role_id, wanted in changes.items() if wanted]
+    taken = [f"<@&{role_id}>" for role_id, wanted in changes.items() if not wanted]
+    parts = []
+    if given:
+        parts.append(f"given you {', '.join(given)}")
+    if taken:
+        parts.append(f"relieved you of {', '.join(taken)}")
+    text = " and ".join(parts) if parts else "changed nothing at all"
+    await interaction.followup.send(f"There. I have {text}, my dear.", ephemeral=True)
+
+
+class RoleToggleButton(discord.ui.DynamicItem[discord.ui.Button], template=r"rolepanel:button:(?P<role>[0-9]+)"):
+    """Self-role panel button; gives its role, or takes it back from someone who already has it."""
+
+    def __init__(self, role_id: int, label: str | None = None, emoji: str | None = None):
+        super().__init__(
+            discord.ui.Button(
+                label=label,
+                emoji=emoji,
+                style=discord.ButtonStyle.secondary,
+                custom_id=f"rolepanel:button:{role_id}"
+            )
+        )
+        self.role_id = role_id
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match: re.Match[str], /):
+        return cls(int(match["role"]))
+
+    async def callback(self, interaction: discord.Interaction):
+        has_role = any(role.id == self.role_id for role in getattr(interaction.user, "roles", []))
+        await apply_panel_roles(interaction, {self.role_id: not has_role})
+
+
+class RoleSelectMenu(discord.ui.DynamicItem[discord.ui.Select], template=r"rolepanel:select"):
+    """
+    Self-role panel select menu; the member ends up with exactly the roles selected among its options.
+    The role IDs live in the option values, so the menu needs no state of its own.
+    """
+
+    def __init__(self, options: list[discord.SelectOption]):
+        super().__init__(
+            discord.ui.Select(
+                placeholder="Choose your roles...",
+                min_values=0,
+                max_values=len(options),
+                options=options,
+                custom_id="rolepanel:select"
+            )
+        )
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Select, match: re.Match[str], /):
+        return cls(item.options)
+
+    async def callback(self, interaction: discord.Interaction):
+        selected = {int(value) for value in self.item.values}
+        changes = {int(option.value): int(option.value) in selected for option in self.item.options}
+        await apply_panel_roles(interaction, changes)
+
+
+def role_panel_view(guild: discord.Guild, emoji_role_map: Dict[str, int], style: str) -> discord.ui.View:
+    """Builds a button or select-menu self-role panel for up to 25 emoji/role pairs."""
+    view = discord.ui.View(timeout=None)
+    pairs = [(emoji, guild.get_role(role_id)) for emoji, role_id in emoji_role_map.items()]
+    pairs = [(emoji, role) for emoji, role in pairs if role][:25]
+    if style == "buttons":
+        for emoji, role in pairs:
+            view.add_item(RoleToggleButton(role.id, label=role.name, emoji=emoji))
+    else:
+        options = [discord.SelectOption(label=role.name, value=str(role.id), emoji=emoji) for emoji, role in pairs]
+        view.add_item(RoleSelectMenu(options))
+    # Panel components are dispatched as dynamic items, so the view is not kept per message
+    view.stop()
+    return view
+
+
+class ReconcileReport(NamedTuple):
+    guilds: int
+    messages: int
+    skipped: int
+    added: int
+    removed: int
+    seconds: float
+
+    def summary(self) -> str:
+        return (
+            f"{self.messages} messages in {self.guilds} guilds ({self.skipped} skipped): "
+            f"{self.added} roles given, {self.removed} taken in {self.seconds:.1f}s"
+        )
 
 
 class ReactionRoles(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.reaction_role_messages: Dict[int,
-                                          Dict[str, int]] = load_reaction_roles()
+        # message_id -> emoji -> role_id, mirrored from the reaction_roles table
+        self.reaction_role_messages: Dict[int, Dict[str, int]] = {}
+        # Rows changed since the last write, keyed like the table
+        self._pending_writes: Dict[tuple[int, str], ReactionRole] = {}
+        self._flush_task: asyncio.Task | None = None
+        self.members = MemberResolver()
+        # Toggles within a second are applied to each member as one role edit
+        self.role_edits = RoleEditQueue(delay=1.0, reason="Reaction roles updated.", resolver=self.members)
+        # message_id -> (guild_id, channel_id); None for mappings imported from the old JSON file
+        self.message_locations: Dict[int, tuple[int | None, int | None]] = {}
+        # message_id -> when its reactions were last reconciled with its roles
+        self.reconciled_at: Dict[int, datetime.datetime] = {}
+        # role_id -> panel message, for roles handed out by a self-role panel rather than by reactions
+        self.panel_roles: Dict[int, int] = {}
+        self.reconcile_edits = RoleEditQueue(
+            reason="Reaction roles reconciled.", limiter=RateLimiter(RECONCILE_EDIT_RATE, 1), resolver=self.members
+        )
+        self._reconcile_lock = asyncio.Lock()
+        self._reconcile_task: asyncio.Task | None = None
+
+    async def cog_load(self):
+        await self.import_json_store()
+        async with async_session() as session:
+            result = await session.execute(select(ReactionRole))
+            for row in result.scalars():
+                self.reaction_role_messages.setdefault(row.message_id, {})[row.emoji] = row.role_id
+                self.message_locations[row.message_id] = (row.guild_id, row.channel_id)
+                if row.reconciled_at:
+                    self.reconciled_at[row.message_id] = row.reconciled_at.replace(tzinfo=datetime.timezone.utc)
+            result = await session.execute(select(PanelRole))
+            self.panel_roles = {row.role_id: row.message_id for row in result.scalars()}
+        self.bot.add_dynamic_items(RoleToggleButton, RoleSelectMenu)
+        self._reconcile_task = asyncio.create_task(self._reconcile_on_startup())
+
+    async def cog_unload(self):
+        self.bot.remove_dynamic_items(RoleToggleButton, RoleSelectMenu)
+        if self._reconcile_task:
+            self._reconcile_task.cancel()
+        if self._flush_task:
+            self._flush_task.cancel()
+        await self.flush_writes()
+        await self.role_edits.flush()
+        logger.info("Reaction role edits: %s", self.role_edits.metrics.summary())
+
+    async def import_json_store(self):
+        """One-time import of the legacy JSON file. Rows already in the database win."""
+        data = await asyncio.to_thread(load_reaction_roles)
+        if not data:
+            return
+
+        async with async_session() as session:
+            result = await session.execute(select(ReactionRole.message_id, ReactionRole.emoji))
+            existing = set(result.all())
+            for message_id, mapping in data.items():
+                for emoji, role_id in mapping.items():
+                    if (message_id, emoji) not in existing:
+                        session.add(ReactionRole(message_id=message_id, emoji=emoji, role_id=role_id))
+            await session.commit()
+
+        await asyncio.to_thread(DATA_FILE.rename, DATA_FILE.with_name(DATA_FILE.name + ".imported"))
+        logger.info("Imported reaction roles for %d messages from %s", len(data), DATA_FILE)
+
+    def set_reaction_role(self, guild_id: int, channel_id: int, message_id: int, emoji: str, role_id: int):
+        """Updates the in-memory index at once and queues the row for the next debounced write."""
+        self.reaction_role_messages.setdefault(message_id, {})[emoji] = role_id
+        self.message_locations[message_id] = (guild_id, channel_id)
+        self._pending_writes[(message_id, emoji)] = ReactionRole(
+            message_id=message_id, emoji=emoji, guild_id=guild_id, channel_id=channel_id, role_id=role_id
+        )
+        if not self._flush_task or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._flush_later())
+
+    async def _flush_later(self):
+        # Keeps retrying while writes fail
+        while True:
+            await asyncio.sleep(WRITE_DEBOUNCE_SECONDS)
+            await self.flush_writes()
+            if not self._pending_writes:
+                return
+
+    async def flush_writes(self):
+        """Writes every queued row in one transaction; failed rows are queued again unless replaced meanwhile."""
+        pending, self._pending_writes = self._pending_writes, {}
+        if not pending:
+            return
+        try:
+            async with async_session() as session:
+                for row in pending.values():
+                    await session.merge(row)
+                await session.commit()
+        except Exception as e:
+            logger.error(f"Error saving reaction roles: {e}")
+            for key, row in pending.items():
+                self._pending_writes.setdefault(key, row)
+
+    async def _reconcile_on_startup(self):
+        # Only hands out missed roles; taking roles away is left to an admin running /syncreactionroles
+        await self.bot.wait_until_ready()
+        try:
+            report = await self.reconcile()
+            logger.info("Reaction role reconciliation: %s", report.summary())
+        except Exception as e:
+            logger.error(f"Error reconciling reaction roles: {e}")
+
+    async def reconcile(self, guild_id: int | None = None, force: bool = False, remove: bool = False) -> ReconcileReport:
+        """
+        Brings role holders back in line with the reactions on every reaction-role message, or those of one guild.
+        Reactors missing their role always get it; holders who haven't reacted only lose it when `remove` is set,
+        since they may have been given it by hand or by another bot.
+        Guilds reconciled within RECONCILE_FRESH_FOR are skipped unless `force`, so an interrupted pass resumes.
+        """
+        async with self._reconcile_lock:
+            started = time.monotonic()
+            now = datetime.datetime.now(datetime.timezone.utc)
+
+            by_guild: Dict[int, list[int]] = defaultdict(list)
+            skipped = 0
+            for message_id, (msg_guild_id, channel_id) in self.message_locations.items():
+                if msg_guild_id is None or channel_id is None:
+                    skipped += 1  # Imported without a location; fixed by running /setreactionroles on it again
+                elif guild_id is None or msg_guild_id == guild_id:
+                    by_guild[msg_guild_id].append(message_id)
+
+            guilds = messages = added = removed = 0
+            for msg_guild_id, message_ids in sorted(by_guild.items()):
+                if not force and all(
+                    m in self.reconciled_at and now - self.reconciled_at[m] < RECONCILE_FRESH_FOR
+                    for m in message_ids
+                ):
+                    continue
+                guild = self.bot.get_guild(msg_guild_id)
+                if not guild:
+                    skipped += len(message_ids)
+                    continue
+
+                read, guild_added, guild_removed = await self._reconcile_guild(guild, sorted(message_ids), remove)
+                guilds += 1
+                messages += len(read)
+                skipped += len(message_ids) - len(read)
+                added += guild_added
+                removed += guild_removed
+
+                for message_id in read:
+                    self.reconciled_at[message_id] = now
+                async with async_session() as session:
+                    await session.execute(
+                        update(ReactionRole).where(ReactionRole.message_id.in_(read)).values(reconciled_at=now)
+                    )
+                    await session.commit()
+
+            return ReconcileReport(guilds, messages, skipped, added, removed, time.monotonic() - started)
+
+    async def _reconcile_guild(
+        self, guild: discord.Guild, message_ids: list[int], remove: bool
+    ) -> tuple[list[int], int, int]:
+        """Reconciles one guild's messages. Returns the messages read, and how many roles were given and taken."""
+        reactors: Dict[int, set[int]] = defaultdict(set)
+        at_hand: Dict[int, discord.Member] = {}
+        # Roles granted by a message that could not be read; their holders are left alone
+        unreadable_roles: set[int] = set()
+        read = []
+
+        for message_id in message_ids:
+            mapping = self.reaction_role_messages.get(message_id, {})
+            channel = guild.get_channel_or_thread(self.message_locations[message_id][1])
+            if channel is None:
+                logger.warning(f"Channel of reaction-role message {message_id} in {guild.id} is gone")
+                unreadable_roles.update(mapping.values())
+                continue
+            try:
+                message = await channel.fetch_message(message_id)
+                for reaction in message.reactions:
+                    role_id = mapping.get(str(reaction.emoji))
+                    if role_id is None:
+                        continue
+                    # Pages through every reactor, 100 per request
+                    async for user in reaction.users(limit=None):
+                        if user.bot:
+                            continue
+                        reactors[role_id].add(user.id)
+                        if isinstance(user, discord.Member):
+                            at_hand[user.id] = user
+            except discord.HTTPException as e:
+                logger.warning(f"Could not read reaction-role message {message_id} in {guild.id}: {e}")
+                unreadable_roles.update(mapping.values())
+                continue
+            read.append(message_id)
+            # Roles whose reactions came back empty still need their holders checked
+            for role_id in mapping.values():
+                reactors.setdefault(role_id, set())
+
+        changes: Dict[int, Dict[int, bool]] = defaultdict(dict)
+        for role_id, reactor_ids in reactors.items():
+            role = guild.get_role(role_id)
+            if role is None:
+                continue
+            holders = {m.id for m in role.members if not m.bot}
+            for user_id in reactor_ids - holders:
+                changes[user_id][role_id] = True
+            if remove and role_id not in unreadable_roles:
+                for user_id in holders - reactor_ids:
+                    changes[user_id][role_id] = False
+
+        async def apply(item: tuple[int, Dict[int, bool]]) -> tuple[int, int]:
+            user_id, role_changes = item
+            member = await self.members.resolve(guild, user_id, at_hand.get(user_id))
+            if member is None or not await self.reconcile_edits.apply_changes(member, role_changes):
+                return 0, 0
+            gained = sum(role_changes.values())
+            return gained, len(role_changes) - gained
+
+        results = await gather_bounded(changes.items(), apply, RECONCILE_CONCURRENCY)
+        counts = [r for r in results if not isinstance(r, BaseException)]
+        return read, sum(a for a, _ in counts), sum(r for _, r in counts)
+
+    @app_commands.command(name="syncreactionroles", description="Bring reaction roles back in line with the reactions on their messages.")
+    @app_commands.guild_only()
+    @app_commands.checks.has_permissions(administrator=True)
+    @app_commands.guild_install()
+    async def syncreactionroles(self, interaction: discord.Interaction):
+        await interaction.response.defer(ephemeral=True)
+        report = await self.reconcile(guild_id=interaction.guild_id, force=True, remove=True)
+        await interaction.followup.send(
+            f"I have set the roles straight, my dear: {report.added} given and {report.removed} taken away "
+            f"across {report.messages} message(s), in {report.seconds:.1f} seconds. Do try to keep up.",
+            ephemeral=True
+        )
 
     @app_commands.command(name="setreactionroles", description="Set emoji:role pairs on a message for reaction roles.")
     @app_commands.describe(
         message_id="The message ID to attach reaction roles to",
-        pairs="Emoji mention and role mention pairs (e.g. 😀 @Role, 🔥 @VIP)"
+        pairs="Emoji mention and role mention pairs (e.g. 😀 @Role, 🔥 @VIP)",
+        style="Reactions on the message, or a panel of buttons or a menu (posted anew unless the message is mine)"
     )
     @app_commands.guild_only()
     @app_commands.checks.has_permissions(administrator=True)
     @app_commands.guild_install()
-    async def setreactionroles(self, interaction: discord.Interaction, message_id: str, pairs: str):
+    async def setreactionroles(
+        self,
+        interaction: discord.Interaction,
+        message_id: str,
+        pairs: str,
+        style: Literal["reactions", "buttons", "menu"] = "reactions"
+    ):
         await interaction.response.defer(ephemeral=True)
 
         try:
@@ -65,18 +427,79 @@ class ReactionRoles(commands.Cog):
             except Exception:
                 return await interaction.followup.send(f"My dear, this simply will not do. The format for `{pair}` is... an abomination.", ephemeral=True)
 
+        if style != "reactions":
+            return await self._post_role_panel(interaction, message, emoji_role_map, style)
+
+        # Reconciling takes a reaction role from anyone who hasn't reacted, which would undo every panel choice
+        skipped = [f"<@&{role_id}>" for role_id in emoji_role_map.values() if role_id in self.panel_roles]
+        emoji_role_map = {emoji: role_id for emoji, role_id in emoji_role_map.items() if role_id not in self.panel_roles}
+        if not emoji_role_map:
+            return await interaction.followup.send(
+                "Those roles are already handed out by a panel, my dear. A role answers to reactions or to a panel, never both.",
+                ephemeral=True
+            )
+
         for emoji in emoji_role_map:
             try:
                 await message.add_reaction(emoji)
             except discord.HTTPException:
                 await interaction.followup.send(f"I'm afraid I can't be seen with... *that* emoji ({emoji}). It's simply not in my vocabulary.", ephemeral=True)
 
-        if msg_id not in self.reaction_role_messages:
-            self.reaction_role_messages[msg_id] = {}
-        self.reaction_role_messages[msg_id].update(emoji_role_map)
-        save_reaction_roles(self.reaction_role_messages)
+        for emoji, role_id in emoji_role_map.items():
+            self.set_reaction_role(interaction.guild_id, interaction.channel_id, msg_id, emoji, role_id)
 
-        await interaction.followup.send(f"The roles have been assigned for message `{msg_id}`. Let's hope the little dears are... grateful.", ephemeral=True)
+        note = f" I left off {', '.join(skipped)}; they answer to a panel already." if skipped else ""
+        await interaction.followup.send(f"The roles have been assigned for message `{msg_id}`. Let's hope the little dears are... grateful.{note}", ephemeral=True)
+
+    async def _post_role_panel(
+        self, interaction: discord.Interaction, message: discord.Message, emoji_role_map: Dict[str, int], style: str
+    ):
+        """Attaches a self-role panel to one of my own messages, or posts it beneath someone else's."""
+        # Reconciling takes a reaction role from anyone who hasn't reacted, so those roles can't be handed out by a panel too
+        reaction_role_ids = {role_id for mapping in self.reaction_role_messages.values() for role_id in mapping.values()}
+        panel_map = {emoji: role_id for emoji, role_id in emoji_role_map.items() if role_id not in reaction_role_ids}
+        if not any(interaction.guild.get_role(role_id) for role_id in panel_map.values()):
+            if len(panel_map) < len(emoji_role_map):
+                return await interaction.followup.send(
+                    "Those roles are already bound to reactions, my dear. A role answers to reactions or to a panel, never both.",
+                    ephemeral=True
+                )
+            return await interaction.followup.send("None of those roles exist, my dear. I cannot build a panel from thin air.", ephemeral=True)
+        view = role_panel_view(interaction.guild, panel_map, style)
+        try:
+            if message.author.id == self.bot.user.id:
+                await message.edit(view=view)
+                panel = message
+            else:
+                panel = await interaction.channel.send(
+                    embed=discord.Embed(
+                        title="Choose Your Roles",
+                        description="Select the roles you wish to wear, my dears. Select them again to take them off.",
+                        color=discord.Color.purple()
+                    ),
+                    view=view
+                )
+        except discord.HTTPException:
+            return await interaction.followup.send(
+                "I could not place the panel. Perhaps one of those emojis is not in my vocabulary.", ephemeral=True
+            )
+
+        # Remembered so the same roles can't later be bound to reactions, whose reconciling would take them back
+        panel_role_ids = [role_id for role_id in panel_map.values() if interaction.guild.get_role(role_id)]
+        try:
+            async with async_session() as session:
+                for role_id in panel_role_ids:
+                    await session.merge(PanelRole(role_id=role_id, guild_id=interaction.guild_id, message_id=panel.id))
+                await session.commit()
+        except Exception as e:
+            logger.error(f"Error saving panel roles for {panel.id}: {e}")
+        self.panel_roles.update((role_id, panel.id) for role_id in panel_role_ids)
+
+        skipped = [f"<@&{role_id}>" for role_id in emoji_role_map.values() if role_id in reaction_role_ids]
+        note = f" I left off {', '.join(skipped)}; they answer to reactions already." if skipped else ""
+        await interaction.followup.send(
+            f"The panel is in place on message `{panel.id}`. Let's hope the little dears are... grateful.{note}", ephemeral=True
+        )
 
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
@@ -89,19 +512,12 @@ class ReactionRoles(commands.Cog):
             return
 
         guild = self.bot.get_guild(payload.guild_id)
-        if not guild:
-            return
-
-        member = await guild.fetch_member(payload.user_id)
-        if not member or member.bot:
+        if not guild or (payload.member and payload.member.bot):
             return
 
-        role = guild.get_role(role_id)
-        if role:
-            try:
-                await member.add_roles(role, reason="Reaction role added.")
-            except discord.Forbidden:
-                pass
+        # Queued before any lookup, so toggles keep the order their events arrived in
+        if guild.get_role(role_id):
+            self.role_edits.add(guild, payload.user_id, role_id, payload.member)
 
     @commands.Cog.listener()
     async def on_raw_reaction_remove(self, payload: discord.RawReactionActionEvent):
@@ -117,16 +533,9 @@ class ReactionRoles(commands.Cog):
         if not guild:
             return
 
-        member = await guild.fetch_member(payload.user_id)
-        if not member or member.bot:
-            return
-
-        role = guild.get_role(role_id)
-        if role:
-            try:
-                await member.remove_roles(role, reason="Reaction role removed.")
-            except discord.Forbidden:
-                pass
+        # Removal events carry no member; the queue resolves it when the edit is made
+        if guild.get_role(role_id):
+            self.role_edits.remove(guild, payload.user_id, role_id)
 
 
 async def setup(bot: commands.Bot):
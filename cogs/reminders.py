@@ -1,21 +1,123 @@
+import asyncio
 import datetime
+import heapq
 import logging
+import os
+import re
+import socket
+import time
+import uuid
+from collections import defaultdict
 from typing import Optional
 
 import discord
-from discord.ext import commands, tasks
+from discord.ext import commands
 from discord import app_commands
-from sqlalchemy import select, delete
+from sqlalchemy import select, delete, update
 
-from database.database import async_session, Reminder
+from database.database import async_session, Reminder, DMChannel
+from utils.concurrency import RateLimiter, gather_bounded
 from utils.reminder_parser import (
+    Recurrence,
     parse_reminder_input,
-    get_next_trigger_from_rule,
-    parse_duration_to_seconds
+    next_triggers
 )
 
 logger = logging.getLogger("morrible")
 
+# How far ahead the scheduler keeps reminders in memory; later ones are loaded when the horizon rolls over
+SCHEDULER_HORIZON = datetime.timedelta(hours=6)
+
+# Users whose due reminders are being delivered at once; each user's own reminders go out in order
+REMINDER_DELIVERY_CONCURRENCY = 10
+
+# How long a reminder whose DM failed for a transient reason waits before it is tried again
+DELIVERY_RETRY_DELAY = datetime.timedelta(minutes=1)
+
+# Reminders overdue by more than this when the schedule is loaded (e.g. after an outage) are drained in the background
+BACKLOG_STALE_AFTER = datetime.timedelta(minutes=5)
+
+# Overdue reminders read per backlog page, and users served from a page at once
+BACKLOG_PAGE_SIZE = 50
+BACKLOG_DRAIN_CONCURRENCY = 2
+
+# Reminders due this soon are delivered with the ones already due, so a user's reminders share one DM
+REMINDER_BATCH_WINDOW = datetime.timedelta(seconds=2)
+
+# Discord's limit on embeds per message, and so on reminders per batched DM
+MAX_REMINDERS_PER_DM = 10
+
+# Reminder DMs sent per second across live delivery and backlog draining
+REMINDER_DM_RATE = 5
+
+# How long a user whose DMs refused a reminder is not tried again; their reminders are held meanwhile, not dropped
+DM_CLOSED_TTL = datetime.timedelta(days=1)
+
+# Identifies this process when claiming reminders, so several instances can share one database
+INSTANCE_ID = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+# How long a claimed reminder is reserved for this instance; a crashed instance's claims lapse after it
+REMINDER_LEASE = datetime.timedelta(minutes=10)
+
+# How often leases on reminders still being delivered are extended, well inside REMINDER_LEASE
+REMINDER_LEASE_RENEWAL = REMINDER_LEASE / 3
+
+
+def as_utc(dt: datetime.datetime) -> datetime.datetime:
+    """SQLite hands datetimes back naive; every stored timestamp is UTC."""
+    return dt.replace(tzinfo=datetime.timezone.utc) if dt.tzinfo is None else dt
+
+
+def recurrence_of(reminder: Reminder) -> Recurrence | None:
+    """Structured recurrence of a reminder, falling back to rows that predate the recurrence columns."""
+    if reminder.interval_seconds or reminder.weekday_mask is not None:
+        return Recurrence(reminder.interval_seconds, reminder.weekday_mask, reminder.time_of_day)
+    if reminder.recurrence_rule:
+        return Recurrence.from_rule(reminder.recurrence_rule)
+    if reminder.is_continuous and reminder.duration_seconds > 0:
+        return Recurrence(interval_seconds=reminder.duration_seconds)
+    return None
+
+
+def next_triggers_for(reminders: list[Reminder], now: datetime.datetime) -> dict[int, datetime.datetime]:
+    """Next trigger after `now` of every repeating reminder in the batch, keyed by reminder ID."""
+    recurring = [(r, recurrence_of(r)) for r in reminders if r.is_continuous]
+    recurring = [(r, recurrence) for r, recurrence in recurring if recurrence]
+    triggers = next_triggers([(recurrence, as_utc(r.next_trigger)) for r, recurrence in recurring], now)
+    return {r.id: next_t for (r, _), next_t in zip(recurring, triggers)}
+
+
+class ReminderMetrics:
+    """Running delivery counters for the reminder scheduler."""
+
+    def __init__(self):
+        self.delivered = 0
+        self.failed = 0
+        self.batches = 0
+        self.last_batch_size = 0
+        self.last_batch_seconds = 0.0
+        self.last_max_lag = 0.0
+        self.backlog_delivered = 0
+
+    def record_batch(self, size: int, delivered: int, seconds: float, max_lag: float):
+        self.batches += 1
+        self.delivered += delivered
+        self.last_batch_size = size
+        self.last_batch_seconds = seconds
+        self.last_max_lag = max_lag
+
+    @property
+    def throughput(self) -> float:
+        """Reminders handled per second in the last batch."""
+        return self.last_batch_size / self.last_batch_seconds if self.last_batch_seconds else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.last_batch_size} due in {self.last_batch_seconds:.2f}s ({self.throughput:.1f}/s), "
+            f"max lag {self.last_max_lag:.2f}s; totals: {self.delivered} delivered, {self.failed} failed, "
+            f"{self.backlog_delivered} from backlog"
+        )
+
 
 class SnoozeSelect(discord.ui.Select):
     """Select menu for choosing snooze durations."""
@@ -53,6 +155,10 @@ class SnoozeSelect(discord.ui.Select):
             session.add(new_snooze)
             await session.commit()
 
+        cog = interaction.client.get_cog("Reminders")
+        if cog:
+            cog.schedule(new_snooze.id, next_t)
+
         ts = int(next_t.timestamp())
         embed = discord.Embed(
             title="💤 Reminder Snoozed",
@@ -73,69 +179,196 @@ class SnoozeSelectView(discord.ui.View):
         self.add_item(SnoozeSelect(reminder_id, message_text))
 
 
-class ReminderDMView(discord.ui.View):
-    """Interactive controls attached to DM reminder notifications."""
+def reminder_text(message: discord.Message, reminder_id: int) -> str:
+    """Recovers a reminder's text from its embed in a delivered reminder DM."""
+    footer = f"ID: {reminder_id}"
+    embed = next((e for e in message.embeds if e.footer.text and e.footer.text.endswith(footer)), None)
+    description = embed.description if embed else ""
+    match = re.search(r"\n\n\*\*(.*)\*\*(?:\n\n\*|$)", description or "", re.S)
+    return match.group(1) if match else "your reminder"
+
+
+async def offer_snooze(interaction: discord.Interaction, reminder_id: int):
+    """Offers the snooze durations for a delivered reminder in an ephemeral menu."""
+    snooze_view = SnoozeSelectView(reminder_id, reminder_text(interaction.message, reminder_id))
+    await interaction.response.send_message(
+        "Select how long you wish to delay this reminder, my dear:",
+        view=snooze_view,
+        ephemeral=True
+    )
+
+
+async def dismiss_reminder_dm(interaction: discord.Interaction):
+    """Disables the controls of a delivered reminder DM and marks its embeds dismissed."""
+    view = discord.ui.View.from_message(interaction.message, timeout=None)
+    for item in view.children:
+        item.disabled = True
+    view.stop()
+    embeds = interaction.message.embeds
+    for embed in embeds:
+        embed.set_footer(text="Morrible Reminders — Dismissed")
+    await interaction.response.edit_message(embeds=embeds, view=view)
+
+
+async def skip_next_occurrence(interaction: discord.Interaction, reminder_id: int):
+    """Moves a repeating reminder past its next occurrence."""
+    async with async_session() as session:
+        stmt = select(Reminder).where(Reminder.id == reminder_id)
+        res = await session.execute(stmt)
+        reminder = res.scalar_one_or_none()
+
+        if not reminder:
+            return await interaction.response.send_message(
+                "This recurring reminder no longer exists in my memory, my dear.", ephemeral=True
+            )
+
+        next_t = None
+        current = as_utc(reminder.next_trigger)
+        recurrence = recurrence_of(reminder)
+        if recurrence:
+            next_t = recurrence.next_after(current, current)
+
+        if next_t:
+            reminder.next_trigger = next_t
+            await session.commit()
+
+            cog = interaction.client.get_cog("Reminders")
+            if cog:
+                cog.schedule(reminder.id, next_t)
+
+            ts = int(next_t.timestamp())
+            await interaction.response.send_message(
+                f"Skipped the next occurrence! Your next reminder will be triggered <t:{ts}:R> (at <t:{ts}:F>).",
+                ephemeral=True
+            )
+        else:
+            await interaction.response.send_message(
+                "Unable to calculate the next trigger time.", ephemeral=True
+            )
+
+
+class ReminderSnoozeButton(discord.ui.DynamicItem[discord.ui.Button], template=r"reminder:snooze:(?P<id>[0-9]+)"):
+    """Snooze button on a reminder DM; offers the snooze durations in an ephemeral menu."""
 
-    def __init__(self, reminder_id: int, message_text: str, is_continuous: bool, recurrence_rule: Optional[str] = None):
-        super().__init__(timeout=None)
+    def __init__(self, reminder_id: int):
+        super().__init__(
+            discord.ui.Button(
+                label="Snooze",
+                style=discord.ButtonStyle.secondary,
+                emoji="💤",
+                custom_id=f"reminder:snooze:{reminder_id}"
+            )
+        )
         self.reminder_id = reminder_id
-        self.message_text = message_text
-        self.is_continuous = is_continuous
-        self.recurrence_rule = recurrence_rule
 
-        # If not repeating, hide skip button
-        if not is_continuous:
-            self.remove_item(self.skip_button)
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match: re.Match[str], /):
+        return cls(int(match["id"]))
 
-    @discord.ui.button(label="Snooze", style=discord.ButtonStyle.secondary, emoji="💤")
-    async def snooze_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        snooze_view = SnoozeSelectView(self.reminder_id, self.message_text)
-        await interaction.response.send_message(
-            "Select how long you wish to delay this reminder, my dear:",
-            view=snooze_view,
-            ephemeral=True
+    async def callback(self, interaction: discord.Interaction):
+        await offer_snooze(interaction, self.reminder_id)
+
+
+class ReminderDismissButton(discord.ui.DynamicItem[discord.ui.Button], template=r"reminder:dismiss:(?P<id>[0-9]+)"):
+    """Dismiss button on a reminder DM; disables the DM's controls."""
+
+    def __init__(self, reminder_id: int):
+        super().__init__(
+            discord.ui.Button(
+                label="Dismiss",
+                style=discord.ButtonStyle.gray,
+                emoji="❌",
+                custom_id=f"reminder:dismiss:{reminder_id}"
+            )
         )
+        self.reminder_id = reminder_id
 
-    @discord.ui.button(label="Dismiss", style=discord.ButtonStyle.gray, emoji="❌")
-    async def dismiss_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        for item in self.children:
-            item.disabled = True
-        embed = interaction.message.embeds[0] if interaction.message.embeds else None
-        if embed:
-            embed.set_footer(text="Morrible Reminders — Dismissed")
-        await interaction.response.edit_message(embed=embed, view=self)
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match: re.Match[str], /):
+        return cls(int(match["id"]))
 
-    @discord.ui.button(label="Skip Next", style=discord.ButtonStyle.primary, emoji="⏭️")
-    async def skip_button(self, interaction: discord.Interaction, button: discord.ui.Button):
-        now = discord.utils.utcnow()
-        async with async_session() as session:
-            stmt = select(Reminder).where(Reminder.id == self.reminder_id)
-            res = await session.execute(stmt)
-            reminder = res.scalar_one_or_none()
+    async def callback(self, interaction: discord.Interaction):
+        await dismiss_reminder_dm(interaction)
 
-            if not reminder:
-                return await interaction.response.send_message(
-                    "This recurring reminder no longer exists in my memory, my dear.", ephemeral=True
-                )
 
-            next_t = None
-            if reminder.recurrence_rule:
-                next_t = get_next_trigger_from_rule(reminder.recurrence_rule, reminder.next_trigger + datetime.timedelta(seconds=1))
-            elif reminder.duration_seconds > 0:
-                next_t = reminder.next_trigger + datetime.timedelta(seconds=reminder.duration_seconds)
+class ReminderSkipButton(discord.ui.DynamicItem[discord.ui.Button], template=r"reminder:skip:(?P<id>[0-9]+)"):
+    """Skip Next button on a repeating reminder DM; moves the reminder past its next occurrence."""
 
-            if next_t:
-                reminder.next_trigger = next_t
-                await session.commit()
-                ts = int(next_t.timestamp())
-                await interaction.response.send_message(
-                    f"Skipped the next occurrence! Your next reminder will be triggered <t:{ts}:R> (at <t:{ts}:F>).",
-                    ephemeral=True
-                )
-            else:
-                await interaction.response.send_message(
-                    "Unable to calculate the next trigger time.", ephemeral=True
-                )
+    def __init__(self, reminder_id: int):
+        super().__init__(
+            discord.ui.Button(
+                label="Skip Next",
+                style=discord.ButtonStyle.primary,
+                emoji="⏭️",
+                custom_id=f"reminder:skip:{reminder_id}"
+            )
+        )
+        self.reminder_id = reminder_id
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Button, match: re.Match[str], /):
+        return cls(int(match["id"]))
+
+    async def callback(self, interaction: discord.Interaction):
+        await skip_next_occurrence(interaction, self.reminder_id)
+
+
+class ReminderBatchSelect(discord.ui.DynamicItem[discord.ui.Select], template=r"reminder:batch:(?P<id>[0-9]+)"):
+    """
+    Select menu on a DM carrying several reminders; snoozes or skips any one of them, or dismisses the lot.
+    Option values are "snooze:<id>", "skip:<id>" or "dismiss", so the menu needs no state of its own.
+    """
+
+    def __init__(self, batch_id: int, options: list[discord.SelectOption]):
+        super().__init__(
+            discord.ui.Select(
+                placeholder="Snooze, skip or dismiss these reminders...",
+                options=options,
+                custom_id=f"reminder:batch:{batch_id}"
+            )
+        )
+
+    @classmethod
+    async def from_custom_id(cls, interaction: discord.Interaction, item: discord.ui.Select, match: re.Match[str], /):
+        return cls(int(match["id"]), item.options)
+
+    async def callback(self, interaction: discord.Interaction):
+        action, _, reminder_id = self.item.values[0].partition(":")
+        if action == "snooze":
+            await offer_snooze(interaction, int(reminder_id))
+        elif action == "skip":
+            await skip_next_occurrence(interaction, int(reminder_id))
+        else:
+            await dismiss_reminder_dm(interaction)
+
+
+def reminder_dm_view(reminder_id: int, is_continuous: bool) -> discord.ui.View:
+    """Controls for a reminder DM. The buttons are dispatched as dynamic items, so nothing is kept per message."""
+    view = discord.ui.View(timeout=None)
+    view.add_item(ReminderSnoozeButton(reminder_id))
+    view.add_item(ReminderDismissButton(reminder_id))
+    # Only repeating reminders have a next occurrence to skip
+    if is_continuous:
+        view.add_item(ReminderSkipButton(reminder_id))
+    # A finished view is sent without being stored against the message
+    view.stop()
+    return view
+
+
+def reminder_batch_view(reminders: list[Reminder]) -> discord.ui.View:
+    """A single select menu controlling every reminder in a batched DM (at most 10, so at most 21 options)."""
+    options = []
+    for reminder in reminders:
+        short = reminder.message if len(reminder.message) <= 60 else reminder.message[:57] + "..."
+        options.append(discord.SelectOption(label=f"Snooze: {short}", value=f"snooze:{reminder.id}", emoji="💤"))
+        if reminder.is_continuous:
+            options.append(discord.SelectOption(label=f"Skip next: {short}", value=f"skip:{reminder.id}", emoji="⏭️"))
+    options.append(discord.SelectOption(label="Dismiss all", value="dismiss", emoji="❌"))
+
+    view = discord.ui.View(timeout=None)
+    view.add_item(ReminderBatchSelect(reminders[0].id, options))
+    view.stop()
+    return view
 
 
 class ClearRemindersView(discord.ui.View):
@@ -151,11 +384,17 @@ class ClearRemindersView(discord.ui.View):
             return await interaction.response.send_message("This is not your prompt to decide, my dear.", ephemeral=True)
 
         async with async_session() as session:
-            stmt = delete(Reminder).where(Reminder.user_id == self.user_id)
+            stmt = delete(Reminder).where(Reminder.user_id == self.user_id).returning(Reminder.id)
             result = await session.execute(stmt)
-            count = result.rowcount
+            deleted_ids = result.scalars().all()
+            count = len(deleted_ids)
             await session.commit()
 
+        cog = interaction.client.get_cog("Reminders")
+        if cog:
+            for reminder_id in deleted_ids:
+                cog.unschedule(reminder_id)
+
         for item in self.children:
             item.disabled = True
 
@@ -187,10 +426,48 @@ class Reminders(commands.Cog):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        self.check_reminders.start()
+        # Min-heap of (next_trigger, reminder_id) for reminders due before the horizon
+        self._heap: list[tuple[datetime.datetime, int]] = []
+        # Current trigger of every scheduled reminder; heap entries that disagree are stale and skipped
+        self._scheduled: dict[int, datetime.datetime] = {}
+        self._horizon_end: datetime.datetime | None = None
+        # Schedule changes made while the horizon is being (re)loaded, applied once it finishes
+        self._loading = False
+        self._pending: dict[int, datetime.datetime | None] = {}
+        self._wakeup = asyncio.Event()
+        self._scheduler_task: asyncio.Task | None = None
+        # Reminders due before this cutoff are left to the backlog drain instead of the heap
+        self._backlog_cutoff: datetime.datetime | None = None
+        self._drain_task: asyncio.Task | None = None
+        # Batches being delivered; the scheduler hands them off and goes back to watching the heap
+        self._delivery_tasks: set[asyncio.Task] = set()
+        self._dm_limiter = RateLimiter(REMINDER_DM_RATE, 1)
+        # Known DM channel per user, and users whose DMs are closed until the given time
+        self._dm_channels: dict[int, int] = {}
+        self._dms_closed: dict[int, datetime.datetime] = {}
+        self.metrics = ReminderMetrics()
+
+    async def cog_load(self):
+        self.bot.add_dynamic_items(ReminderSnoozeButton, ReminderDismissButton, ReminderSkipButton, ReminderBatchSelect)
+
+        async with async_session() as session:
+            result = await session.execute(select(DMChannel))
+            for row in result.scalars():
+                if row.channel_id:
+                    self._dm_channels[row.user_id] = row.channel_id
+                if row.closed_until:
+                    self._dms_closed[row.user_id] = as_utc(row.closed_until)
+
+        self._scheduler_task = asyncio.create_task(self.run_scheduler())
 
     def cog_unload(self):
-        self.check_reminders.cancel()
+        self.bot.remove_dynamic_items(ReminderSnoozeButton, ReminderDismissButton, ReminderSkipButton, ReminderBatchSelect)
+        if self._scheduler_task:
+            self._scheduler_task.cancel()
+        if self._drain_task:
+            self._drain_task.cancel()
+        for task in self._delivery_tasks:
+            task.cancel()
 
     def format_seconds(self, seconds: int) -> str:
         """Formats an integer number of seconds into a human-readable duration."""
@@ -209,90 +486,458 @@ class Reminders(commands.Cog):
         rem_hours = hours % 24
         return f"{days}d {rem_hours}h" if rem_hours else f"{days}d"
 
-    @tasks.loop(seconds=10)
-    async def check_reminders(self):
-        """Periodically checks database for due reminders and sends them."""
+    def schedule(self, reminder_id: int, when: datetime.datetime):
+        """Queues a reminder for delivery at `when`, replacing any earlier schedule for it."""
+        if self._loading:
+            self._pending[reminder_id] = when
+            return
+        if self._horizon_end is None:
+            return  # The initial load will read it from the database
+        when = as_utc(when)
+        if when > self._horizon_end:
+            # Loaded again once the horizon reaches it
+            self._scheduled.pop(reminder_id, None)
+            return
+        self._scheduled[reminder_id] = when
+        heapq.heappush(self._heap, (when, reminder_id))
+        self._wakeup.set()
+
+    def unschedule(self, reminder_id: int):
+        """Drops a reminder from the schedule. Its heap entry is discarded lazily."""
+        if self._loading:
+            self._pending[reminder_id] = None
+            return
+        self._scheduled.pop(reminder_id, None)
+
+    async def _load_horizon(self, now: datetime.datetime):
+        """Loads every reminder due before the next horizon into the heap, leaving stale ones to the backlog drain."""
+        horizon_end = now + SCHEDULER_HORIZON
+        stale_cutoff = now - BACKLOG_STALE_AFTER
+        self._loading = True
+        try:
+            async with async_session() as session:
+                result = await session.execute(
+                    select(Reminder.id, Reminder.next_trigger).where(
+                        Reminder.next_trigger <= horizon_end,
+                        Reminder.next_trigger >= stale_cutoff
+                    )
+                )
+                rows = result.all()
+        finally:
+            self._loading = False
+
+        self._backlog_cutoff = stale_cutoff
+        if not self._drain_task or self._drain_task.done():
+            self._drain_task = asyncio.create_task(self.drain_backlog())
+
+        self._horizon_end = horizon_end
+        self._scheduled = {reminder_id: as_utc(trigger) for reminder_id, trigger in rows}
+        self._heap = [(trigger, reminder_id) for reminder_id, trigger in self._scheduled.items()]
+        heapq.heapify(self._heap)
+
+        pending, self._pending = self._pending, {}
+        for reminder_id, when in pending.items():
+            if when is None:
+                self.unschedule(reminder_id)
+            else:
+                self.schedule(reminder_id, when)
+
+    def _pop_due(self, now: datetime.datetime) -> list[int]:
+        """Pops the IDs of every scheduled reminder due at or before `now`."""
+        due = []
+        while self._heap and self._heap[0][0] <= now:
+            when, reminder_id = heapq.heappop(self._heap)
+            if self._scheduled.get(reminder_id) == when:
+                del self._scheduled[reminder_id]
+                due.append(reminder_id)
+        return due
+
+    async def run_scheduler(self):
+        """Sleeps until the next reminder is due (or the schedule changes), then starts delivering it."""
         await self.bot.wait_until_ready()
-        now = discord.utils.utcnow()
 
+        while True:
+            try:
+                now = discord.utils.utcnow()
+                if self._horizon_end is None or now >= self._horizon_end:
+                    await self._load_horizon(now)
+
+                due = self._pop_due(now + REMINDER_BATCH_WINDOW)
+                if due:
+                    # A big batch takes a while at REMINDER_DM_RATE; reminders due meanwhile must not wait behind it
+                    self._spawn_delivery(due)
+                    continue
+
+                wake_at = self._horizon_end
+                if self._heap:
+                    wake_at = min(wake_at, self._heap[0][0])
+
+                self._wakeup.clear()
+                try:
+                    await asyncio.wait_for(self._wakeup.wait(), timeout=max((wake_at - now).total_seconds(), 0))
+                except asyncio.TimeoutError:
+                    pass
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Error in reminder scheduler: {e}")
+                await asyncio.sleep(10)
+
+    def _spawn_delivery(self, reminder_ids: list[int]):
+        """Delivers a due batch in the background, keeping a reference until it finishes."""
+        task = asyncio.create_task(self.deliver_reminders(reminder_ids))
+        self._delivery_tasks.add(task)
+        task.add_done_callback(self._delivery_finished)
+
+    def _delivery_finished(self, task: asyncio.Task):
+        self._delivery_tasks.discard(task)
+        if not task.cancelled() and task.exception():
+            logger.error(f"Error delivering reminders: {task.exception()}")
+
+    async def drain_backlog(self):
+        """
+        Delivers reminders left overdue by downtime, oldest first, one page at a time.
+        Each repeating reminder is sent once with a count of the occurrences that were missed.
+        Backlog DMs only go out while no live reminder is waiting on the rate limit.
+        """
+        last_key: tuple[datetime.datetime, int] | None = None
+        while True:
+            try:
+                stmt = select(Reminder).where(Reminder.next_trigger < self._backlog_cutoff)
+                if last_key:
+                    trigger, reminder_id = last_key
+                    stmt = stmt.where(
+                        (Reminder.next_trigger > trigger)
+                        | ((Reminder.next_trigger == trigger) & (Reminder.id > reminder_id))
+                    )
+                stmt = stmt.order_by(Reminder.next_trigger, Reminder.id).limit(BACKLOG_PAGE_SIZE)
+                async with async_session() as session:
+                    page = (await session.execute(stmt)).scalars().all()
+            except Exception as e:
+                logger.error(f"Error loading reminder backlog: {e}")
+                await asyncio.sleep(10)
+                continue
+
+            if not page:
+                return
+            # Only moved past once the page has been handled, so a failed claim reads the same page again
+            page_end = (page[-1].next_trigger, page[-1].id)
+
+            now = discord.utils.utcnow()
+            try:
+                page = await self._claim([r.id for r in page], now)
+            except Exception as e:
+                logger.error(f"Error claiming reminder backlog: {e}")
+                await asyncio.sleep(10)
+                continue
+            if not page:
+                last_key = page_end
+                continue  # Another instance is draining this page
+            missed = {}
+            for reminder in page:
+                recurrence = recurrence_of(reminder) if reminder.is_continuous else None
+                missed[reminder.id] = recurrence.count_between(as_utc(reminder.next_trigger), now) if recurrence else 1
+
+            by_user: dict[int, list[Reminder]] = defaultdict(list)
+            for reminder in page:
+                by_user[reminder.user_id].append(reminder)
+
+            upcoming = next_triggers_for(page, now)
+            renewal = asyncio.create_task(self._renew_leases([r.id for r in page]))
+            try:
+                results = await gather_bounded(
+                    by_user.values(),
+                    lambda reminders: self._deliver_to_user(reminders, upcoming, missed),
+                    BACKLOG_DRAIN_CONCURRENCY
+                )
+            finally:
+                renewal.cancel()
+            for res in results:
+                if isinstance(res, BaseException):
+                    logger.error(f"Error delivering reminder backlog: {res}")
+                else:
+                    self.metrics.backlog_delivered += res
+            last_key = page_end
+
+            logger.info(f"Reminder backlog: drained a page of {len(page)}; {self.metrics.backlog_delivered} delivered so far")
+
+    async def _claim(
+        self, reminder_ids: list[int], now: datetime.datetime, due_by: datetime.datetime | None = None
+    ) -> list[Reminder]:
+        """
+        Atomically leases the given reminders due by `due_by` (default `now`) to this instance and returns the ones it won.
+        Reminders held by another instance are looked at again once their lease runs out.
+        """
         async with async_session() as session:
+            stmt = (
+                update(Reminder)
+                .where(
+                    Reminder.id.in_(reminder_ids),
+                    Reminder.next_trigger <= (due_by or now),
+                    (Reminder.claim_owner.is_(None))
+                    | (Reminder.claim_owner == INSTANCE_ID)
+                    | (Reminder.lease_expires_at < now)
+                )
+                .values(claim_owner=INSTANCE_ID, lease_expires_at=now + REMINDER_LEASE)
+                .returning(Reminder)
+                .execution_options(synchronize_session=False)
+            )
+            claimed = (await session.scalars(stmt)).all()
+            await session.commit()
+
+            claimed_ids = {r.id for r in claimed}
+            unclaimed = [reminder_id for reminder_id in reminder_ids if reminder_id not in claimed_ids]
+            if unclaimed:
+                result = await session.execute(
+                    select(Reminder.id, Reminder.next_trigger, Reminder.lease_expires_at)
+                    .where(Reminder.id.in_(unclaimed))
+                )
+                for reminder_id, trigger, lease_expires_at in result.all():
+                    when = as_utc(trigger)
+                    if lease_expires_at:
+                        when = max(when, as_utc(lease_expires_at))
+                    self.schedule(reminder_id, when)
+
+        return claimed
+
+    async def _renew_leases(self, reminder_ids: list[int]):
+        """
+        Extends this instance's lease on the given reminders every REMINDER_LEASE_RENEWAL until cancelled, so no
+        other instance takes over reminders that are still queued for delivery here. Finished ones are unclaimed
+        or deleted, and so drop out on their own.
+        """
+        while True:
+            await asyncio.sleep(REMINDER_LEASE_RENEWAL.total_seconds())
+            try:
+                async with async_session() as session:
+                    await session.execute(
+                        update(Reminder)
+                        .where(Reminder.id.in_(reminder_ids), Reminder.claim_owner == INSTANCE_ID)
+                        .values(lease_expires_at=discord.utils.utcnow() + REMINDER_LEASE)
+                        .execution_options(synchronize_session=False)
+                    )
+                    await session.commit()
+            except Exception as e:
+                logger.error(f"Error renewing reminder leases: {e}")
+
+    async def deliver_reminders(self, reminder_ids: list[int]):
+        """Sends the given due reminders through a bounded worker pool, one user's reminders in order."""
+        started = time.monotonic()
+        now = discord.utils.utcnow()
+        due_by = now + REMINDER_BATCH_WINDOW
+
+        try:
+            due_reminders = await self._claim(reminder_ids, now, due_by)
+        except Exception as e:
+            logger.error(f"Error claiming due reminders: {e}")
+            for reminder_id in reminder_ids:
+                self.schedule(reminder_id, now + DELIVERY_RETRY_DELAY)
+            return
+
+        if not due_reminders:
+            return
+
+        by_user: dict[int, list[Reminder]] = defaultdict(list)
+        for reminder in sorted(due_reminders, key=lambda r: r.next_trigger):
+            by_user[reminder.user_id].append(reminder)
+
+        # Reminders delivered early within the batch window must not land on their current trigger again
+        upcoming = next_triggers_for(due_reminders, due_by)
+        # A batch can take longer to send than one lease lasts, at REMINDER_DM_RATE DMs a second
+        renewal = asyncio.create_task(self._renew_leases([r.id for r in due_reminders]))
+        try:
+            results = await gather_bounded(
+                by_user.values(),
+                lambda reminders: self._deliver_to_user(reminders, upcoming),
+                REMINDER_DELIVERY_CONCURRENCY
+            )
+        finally:
+            renewal.cancel()
+
+        delivered = 0
+        for res in results:
+            if isinstance(res, BaseException):
+                logger.error(f"Error delivering reminders: {res}")
+            else:
+                delivered += res
+
+        lags = [(now - as_utc(r.next_trigger)).total_seconds() for r in due_reminders]
+        self.metrics.record_batch(len(due_reminders), delivered, time.monotonic() - started, max(lags))
+        logger.info("Reminder batch: %s", self.metrics.summary())
+
+    async def _deliver_to_user(
+        self,
+        reminders: list[Reminder],
+        upcoming: dict[int, datetime.datetime],
+        backlog: dict[int, int] | None = None
+    ) -> int:
+        """
+        Delivers one user's due reminders in trigger order. Returns how many were sent.
+        `upcoming` holds the precomputed next trigger of each repeating reminder; `backlog`, when
+        draining overdue reminders, holds how many occurrences of each one were missed.
+        """
+        user_id = reminders[0].user_id
+        closed_until = self._dms_closed.get(user_id)
+        if closed_until and closed_until > discord.utils.utcnow():
+            await self._hold_reminders(reminders, upcoming, closed_until)
+            return 0
+
+        try:
+            channel = await self._dm_channel(user_id)
+        except discord.HTTPException as e:
+            logger.error(f"Error opening DM channel with {user_id}: {e}")
+            for reminder in reminders:
+                self.schedule(reminder.id, discord.utils.utcnow() + DELIVERY_RETRY_DELAY)
+            return 0
+        if channel is None:
+            for reminder in reminders:
+                await self._finish_reminder(reminder, None)
+            return 0
+
+        delivered = 0
+        for start in range(0, len(reminders), MAX_REMINDERS_PER_DM):
+            chunk = reminders[start:start + MAX_REMINDERS_PER_DM]
             try:
-                stmt = select(Reminder).where(Reminder.next_trigger <= now)
-                result = await session.execute(stmt)
-                due_reminders = result.scalars().all()
-
-                if not due_reminders:
-                    return
-
-                for reminder in due_reminders:
-                    user = self.bot.get_user(reminder.user_id)
-                    if not user:
-                        try:
-                            user = await self.bot.fetch_user(reminder.user_id)
-                        except discord.HTTPException:
-                            await session.delete(reminder)
-                            continue
-
-                    try:
-                        embed = discord.Embed(
-                            title="🕰️ A Gentle Reminder",
-                            color=discord.Color.blurple(),
-                            timestamp=discord.utils.utcnow()
-                        )
-
-                        if reminder.is_continuous:
-                            rule_desc = f"every {self.format_seconds(reminder.duration_seconds)}" if reminder.duration_seconds > 0 else "on your recurring schedule"
-                            embed.description = (
-                                f"My dear, here is your recurring reminder:\n\n"
-                                f"**{reminder.message}**\n\n"
-                                f"*This reminder repeats {rule_desc}.*"
-                            )
-                        else:
-                            embed.description = (
-                                f"My dear, here is the reminder you requested:\n\n"
-                                f"**{reminder.message}**"
-                            )
-
-                        embed.set_footer(text=f"Morrible Reminders • ID: {reminder.id}")
-                        view = ReminderDMView(
-                            reminder_id=reminder.id,
-                            message_text=reminder.message,
-                            is_continuous=reminder.is_continuous,
-                            recurrence_rule=reminder.recurrence_rule
-                        )
-                        await user.send(embed=embed, view=view)
-
-                    except discord.Forbidden:
-                        logger.warning(
-                            f"Unable to send DM reminder to user {reminder.user_id} (DMs closed/blocked). Deleting reminder."
-                        )
-                        await session.delete(reminder)
-                        continue
-                    except Exception as e:
-                        logger.error(f"Error sending reminder to {reminder.user_id}: {e}")
-                        continue
-
-                    # Reschedule or delete
-                    if reminder.is_continuous:
-                        next_t = None
-                        if reminder.recurrence_rule:
-                            next_t = get_next_trigger_from_rule(reminder.recurrence_rule, now)
-                        elif reminder.duration_seconds > 0:
-                            next_t = reminder.next_trigger + datetime.timedelta(seconds=reminder.duration_seconds)
-                            while next_t <= now:
-                                next_t += datetime.timedelta(seconds=reminder.duration_seconds)
-
-                        if next_t:
-                            reminder.next_trigger = next_t
-                        else:
-                            await session.delete(reminder)
-                    else:
-                        await session.delete(reminder)
+                embeds = [self._reminder_embed(reminder, backlog) for reminder in chunk]
+                if len(chunk) == 1:
+                    view = reminder_dm_view(chunk[0].id, chunk[0].is_continuous)
+                else:
+                    view = reminder_batch_view(chunk)
+                await self._dm_limiter.acquire(urgent=backlog is None)
+                await channel.send(embeds=embeds, view=view)
+
+            except discord.Forbidden:
+                # The rest of the user's reminders would be refused too, so they are held along with this chunk
+                held = reminders[start:]
+                logger.warning(
+                    f"Unable to send DM reminder to user {user_id} (DMs closed/blocked). Holding {len(held)} reminder(s)."
+                )
+                self.metrics.failed += len(held)
+                closed_until = discord.utils.utcnow() + DM_CLOSED_TTL
+                await self._save_dm_channel(user_id, channel_id=self._dm_channels.get(user_id), closed_until=closed_until)
+                await self._hold_reminders(held, upcoming, closed_until)
+                break
+            except Exception as e:
+                logger.error(f"Error sending reminders to {user_id}: {e}")
+                self.metrics.failed += len(chunk)
+                if isinstance(e, discord.NotFound):
+                    # The stored DM channel is gone; the retry opens a new one
+                    await self._save_dm_channel(user_id)
+                for reminder in chunk:
+                    self.schedule(reminder.id, discord.utils.utcnow() + DELIVERY_RETRY_DELAY)
+                continue
+
+            delivered += len(chunk)
+            for reminder in chunk:
+                await self._finish_reminder(reminder, upcoming.get(reminder.id))
+
+        return delivered
+
+    async def _hold_reminders(
+        self, reminders: list[Reminder], upcoming: dict[int, datetime.datetime], closed_until: datetime.datetime
+    ):
+        """
+        Keeps the reminders of a user whose DMs are closed without sending them: repeating ones skip to their
+        next occurrence and one-time ones wait until `closed_until`, when they are tried again.
+        """
+        for reminder in reminders:
+            await self._finish_reminder(reminder, upcoming.get(reminder.id) or closed_until)
+
+    async def _dm_channel(self, user_id: int) -> discord.abc.Messageable | None:
+        """
+        Returns a user's DM channel, from the stored channel ID when there is one so that
+        neither the user nor the channel has to be fetched. Returns None if the user no longer exists.
+        """
+        channel_id = self._dm_channels.get(user_id)
+        if channel_id:
+            return self.bot.get_partial_messageable(channel_id, type=discord.ChannelType.private)
+
+        user = self.bot.get_user(user_id)
+        if not user:
+            try:
+                user = await self.bot.fetch_user(user_id)
+            except discord.HTTPException:
+                return None
+
+        channel = user.dm_channel or await user.create_dm()
+        await self._save_dm_channel(user_id, channel_id=channel.id)
+        return channel
 
+    async def _save_dm_channel(
+        self, user_id: int, channel_id: int | None = None, closed_until: datetime.datetime | None = None
+    ):
+        """Stores what is known about a user's DMs, replacing both fields; no channel and no closure forgets both."""
+        if channel_id:
+            self._dm_channels[user_id] = channel_id
+        else:
+            self._dm_channels.pop(user_id, None)
+        if closed_until:
+            self._dms_closed[user_id] = closed_until
+        else:
+            self._dms_closed.pop(user_id, None)
+
+        try:
+            async with async_session() as session:
+                await session.merge(DMChannel(user_id=user_id, channel_id=channel_id, closed_until=closed_until))
                 await session.commit()
+        except Exception as e:
+            logger.error(f"Error saving DM channel for {user_id}: {e}")
 
-            except Exception as e:
-                logger.error(f"Error in check_reminders task: {e}")
+    def _reminder_embed(self, reminder: Reminder, backlog: dict[int, int] | None) -> discord.Embed:
+        """Builds the DM embed for one reminder, noting missed occurrences when it comes from the backlog."""
+        embed = discord.Embed(
+            title="🕰️ A Gentle Reminder",
+            color=discord.Color.blurple(),
+            timestamp=discord.utils.utcnow()
+        )
+
+        if reminder.is_continuous:
+            rule_desc = f"every {self.format_seconds(reminder.duration_seconds)}" if reminder.duration_seconds > 0 else "on your recurring schedule"
+            embed.description = (
+                f"My dear, here is your recurring reminder:\n\n"
+                f"**{reminder.message}**\n\n"
+                f"*This reminder repeats {rule_desc}.*"
+            )
+        else:
+            embed.description = (
+                f"My dear, here is the reminder you requested:\n\n"
+                f"**{reminder.message}**"
+            )
+
+        if backlog is not None:
+            missed = backlog.get(reminder.id, 1)
+            due_ts = int(as_utc(reminder.next_trigger).timestamp())
+            if missed > 1:
+                embed.description += (
+                    f"\n\n*I was detained elsewhere, and you missed this reminder {missed} times "
+                    f"since <t:{due_ts}:f>. I have gathered them into this single notice.*"
+                )
+            else:
+                embed.description += f"\n\n*I was detained elsewhere; this was due <t:{due_ts}:R>.*"
+
+        embed.set_footer(text=f"Morrible Reminders • ID: {reminder.id}")
+        return embed
+
+    async def _finish_reminder(self, reminder: Reminder, next_t: Optional[datetime.datetime]):
+        """Moves a handled reminder to `next_t`, or deletes it when there is none, in its own short transaction."""
+        # Matching on the old trigger leaves alone a reminder the user edited while it was being delivered,
+        # and matching on the owner leaves alone one re-claimed by another instance after our lease lapsed
+        unchanged = (
+            Reminder.id == reminder.id,
+            Reminder.next_trigger == reminder.next_trigger,
+            Reminder.claim_owner == INSTANCE_ID
+        )
+        async with async_session() as session:
+            if next_t:
+                await session.execute(
+                    update(Reminder).where(*unchanged).values(next_trigger=next_t, claim_owner=None, lease_expires_at=None)
+                )
+            else:
+                await session.execute(delete(Reminder).where(*unchanged))
+            await session.commit()
+
+        if next_t:
+            self.schedule(reminder.id, next_t)
 
     reminder_group = app_commands.Group(
         name="reminder",
@@ -319,7 +964,7 @@ class Reminders(commands.Cog):
             )
 
         now = discord.utils.utcnow()
-        next_t, is_cont, rule, dur_sec, desc = parse_reminder_input(
+        next_t, is_cont, recurrence, dur_sec, desc = parse_reminder_input(
             schedule, is_continuous_override=continuous, now=now
         )
 
@@ -335,7 +980,7 @@ class Reminders(commands.Cog):
                 ephemeral=True
             )
 
-        if is_cont and dur_sec > 0 and dur_sec < 300 and not rule.startswith("DAYS:"):
+        if is_cont and dur_sec > 0 and dur_sec < 300 and not recurrence.is_weekly:
             return await interaction.response.send_message(
                 "A continuous reminder must have an interval of at least 5 minutes. I simply refuse to pester you any more frequently than that.",
                 ephemeral=True
@@ -357,13 +1002,18 @@ class Reminders(commands.Cog):
                 message=message,
                 is_continuous=is_cont,
                 duration_seconds=dur_sec,
-                recurrence_rule=rule,
-                next_trigger=next_t
+                next_trigger=next_t,
+                **(recurrence or Recurrence())._asdict()
             )
 
             session.add(new_reminder)
             await session.commit()
 
+        self.schedule(new_reminder.id, next_t)
+        if interaction.user.id in self._dms_closed:
+            # Setting a new reminder is taken as a sign they have opened their DMs again
+            await self._save_dm_channel(interaction.user.id, channel_id=self._dm_channels.get(interaction.user.id))
+
         ts = int(next_t.timestamp())
         rel_time = f"<t:{ts}:R>"
         abs_time = f"<t:{ts}:F>"
@@ -400,7 +1050,8 @@ class Reminders(commands.Cog):
             ts = int(reminder.next_trigger.timestamp())
             mode = "🔄 Repeating" if reminder.is_continuous else "📍 One-time"
             
-            if reminder.recurrence_rule and reminder.recurrence_rule.startswith("DAYS:"):
+            recurrence = recurrence_of(reminder)
+            if recurrence and recurrence.is_weekly:
                 rule_str = " (weekly schedule)"
             elif reminder.is_continuous and reminder.duration_seconds > 0:
                 rule_str = f" every {self.format_seconds(reminder.duration_seconds)}"
@@ -465,7 +1116,7 @@ class Reminders(commands.Cog):
             desc_info = ""
             if schedule:
                 now = discord.utils.utcnow()
-                next_t, is_cont, rule, dur_sec, desc = parse_reminder_input(
+                next_t, is_cont, recurrence, dur_sec, desc = parse_reminder_input(
                     schedule, is_continuous_override=reminder.is_continuous, now=now
                 )
 
@@ -477,12 +1128,17 @@ class Reminders(commands.Cog):
 
                 reminder.next_trigger = next_t
                 reminder.is_continuous = is_cont
-                reminder.recurrence_rule = rule
+                reminder.recurrence_rule = None
+                for column, value in (recurrence or Recurrence())._asdict().items():
+                    setattr(reminder, column, value)
                 reminder.duration_seconds = dur_sec
                 desc_info = f"\n⏰ New timing: {desc} (<t:{int(next_t.timestamp())}:R>)"
 
             await session.commit()
 
+        if schedule:
+            self.schedule(reminder_id, next_t)
+
         await interaction.response.send_message(
             f"Very well. Reminder `{reminder_id}` has been updated!{desc_info}",
             ephemeral=True
@@ -510,6 +1166,8 @@ class Reminders(commands.Cog):
             await session.delete(reminder)
             await session.commit()
 
+        self.unschedule(reminder_id)
+
         await interaction.response.send_message(
             f"Very well. The reminder with ID `{reminder_id}` has been dissolved into the void. You are on your own now.",
             ephemeral=True
@@ -1,14 +1,63 @@
 from discord.ext import commands
 from discord import app_commands, Interaction, ui, Embed, Member, User, TextChannel, Thread, ButtonStyle, ChannelType
+import asyncio
+import datetime
+import os
 import discord
 import logging
 
 logger = logging.getLogger("morrible")
 from sqlalchemy.future import select
-from sqlalchemy import update
-from database.tickets_db import TicketChannel, Ticket, TicketLogChannel, async_session
-from typing import Literal, Optional
+from sqlalchemy import update, delete, func
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.exc import IntegrityError
+from database.tickets_db import TicketChannel, Ticket, TicketLogChannel, TicketDailyStats, async_session
+from typing import Literal, NamedTuple, Optional
 from cogs.moderation import get_highest_role_level, require_role
+from utils.transcripts import BASE_DIR, archive_and_delete
+
+# channel_id of a ticket reserved before its thread exists
+PENDING_CHANNEL_ID = 0
+# How long a reservation may wait for its thread before another click can take its place
+RESERVATION_TIMEOUT = datetime.timedelta(minutes=2)
+
+# Lowest role level whose reply counts as the staff response to a ticket
+STAFF_RESPONSE_LEVEL = 1
+
+
+class AwaitingResponse(NamedTuple):
+    """An open ticket whose thread has not yet had a staff reply."""
+    ticket_id: int
+    ticket_type: str
+    user_id: int
+    opened_at: datetime.datetime
+
+
+def _as_utc(moment: datetime.datetime) -> datetime.datetime:
+    """SQLite hands back naive datetimes; every timestamp it stores is UTC."""
+    return moment if moment.tzinfo else moment.replace(tzinfo=datetime.timezone.utc)
+
+
+def _format_seconds(seconds: float) -> str:
+    minutes = round(seconds) // 60
+    if minutes < 60:
+        return f"{minutes}m"
+    hours, minutes = divmod(minutes, 60)
+    if hours < 24:
+        return f"{hours}h {minutes}m" if minutes else f"{hours}h"
+    days, hours = divmod(hours, 24)
+    return f"{days}d {hours}h" if hours else f"{days}d"
+
+
+async def bump_daily_stats(session, guild_id: int, ticket_type: str, when: datetime.datetime, **increments):
+    """Adds `increments` to the counters of `when`'s day for the ticket type, creating the row if needed."""
+    stmt = sqlite_insert(TicketDailyStats).values(
+        guild_id=guild_id, day=when.date(), ticket_type=ticket_type, **increments)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=["guild_id", "day", "ticket_type"],
+        set_={column: getattr(TicketDailyStats, column) + value for column, value in increments.items()}
+    )
+    await session.execute(stmt)
 
 
 async def _get_member_safe(guild, user_id):
@@ -28,6 +77,37 @@ async def _get_member_safe(guild, user_id):
     return member
 
 
+async def reserve_ticket(guild_id: int, user_id: int, ticket_type: str) -> int | None:
+    """
+    Inserts the user's open ticket with a placeholder channel, returning its ID, or None if they already have one.
+    A reservation whose thread never arrived (the bot stopped mid-creation) is released after RESERVATION_TIMEOUT.
+    """
+    for _ in range(2):
+        async with async_session() as session:
+            ticket = Ticket(guild_id=guild_id, user_id=user_id, channel_id=PENDING_CHANNEL_ID, ticket_type=ticket_type)
+            session.add(ticket)
+            try:
+                await session.commit()
+                return ticket.id
+            except IntegrityError:
+                await session.rollback()
+
+            stale_before = discord.utils.utcnow() - RESERVATION_TIMEOUT
+            result = await session.execute(
+                delete(Ticket).where(
+                    Ticket.guild_id == guild_id,
+                    Ticket.user_id == user_id,
+                    Ticket.status == "open",
+                    Ticket.channel_id == PENDING_CHANNEL_ID,
+                    Ticket.created_at < stale_before.replace(tzinfo=None)
+                )
+            )
+            await session.commit()
+            if not result.rowcount:
+                return None
+    return None
+
+
 class TicketView(ui.View):
     def __init__(self, bot):
         super().__init__(timeout=None)
@@ -42,61 +122,53 @@ class TicketView(ui.View):
 
         async with async_session() as session:
             config = await session.get(TicketChannel, guild.id)
-            if not config:
-                return await interaction.response.send_message("Oh, you poor, unfortunate soul. It seems the ticketing system is not yet... *fully realized*. You'll have to take it up with the administration.", ephemeral=True)
-
-            result = await session.execute(
-                select(Ticket).where(
-                    Ticket.guild_id == guild.id,
-                    Ticket.user_id == user.id,
-                    Ticket.status == "open"
-                )
-            )
+        if not config:
+            return await interaction.response.send_message("Oh, you poor, unfortunate soul. It seems the ticketing system is not yet... *fully realized*. You'll have to take it up with the administration.", ephemeral=True)
 
-            existing_ticket = result.scalar()
-            if existing_ticket:
-                return await interaction.response.send_message("Patience, my dear. You already have a ticket open. One simply cannot have *all* of my attention at once.", ephemeral=True)
+        base_channel = guild.get_channel(int(config.channel_id))
+        if not base_channel or not isinstance(base_channel, TextChannel):
+            return await interaction.response.send_message("The designated place for such... *requests*... has vanished or is invalid. How utterly bizarre.", ephemeral=True)
 
-            base_channel = guild.get_channel(int(config.channel_id))
-            if not base_channel or not isinstance(base_channel, TextChannel):
-                return await interaction.response.send_message("The designated place for such... *requests*... has vanished or is invalid. How utterly bizarre.", ephemeral=True)
+        # Check bot permissions for creating private threads
+        bot_member = guild.get_member(self.bot.user.id) or guild.me
+        if bot_member is None:
+            try:
+                bot_member = await guild.fetch_member(self.bot.user.id)
+            except Exception:
+                bot_member = None
 
-            # Check bot permissions for creating private threads
-            bot_member = guild.get_member(self.bot.user.id) or guild.me
-            if bot_member is None:
-                try:
-                    bot_member = await guild.fetch_member(self.bot.user.id)
-                except Exception:
-                    bot_member = None
+        if bot_member:
+            perms = base_channel.permissions_for(bot_member)
+            if not (perms.create_private_threads or perms.manage_threads):
+                return await interaction.response.send_message("I lack permissions to create private threads in the configured channel. Please grant `Create Private Threads` or `Manage Threads`.", ephemeral=True)
 
-            if bot_member:
-                perms = base_channel.permissions_for(bot_member)
-                if not (perms.create_private_threads or perms.manage_threads):
-                    return await interaction.response.send_message("I lack permissions to create private threads in the configured channel. Please grant `Create Private Threads` or `Manage Threads`.", ephemeral=True)
+        # Claim the user's one open ticket before any thread exists; a second click fails on the unique index
+        ticket_id = await reserve_ticket(guild.id, user.id, ticket_type)
+        if ticket_id is None:
+            return await interaction.response.send_message("Patience, my dear. You already have a ticket open. One simply cannot have *all* of my attention at once.", ephemeral=True)
 
-            try:
-                thread = await base_channel.create_thread(name=f"{ticket_type}-{user.name}", type=ChannelType.private_thread, invitable=False)
-            except discord.Forbidden:
-                return await interaction.response.send_message("I cannot create a thread in the configured channel. Please check my permissions.", ephemeral=True)
-            except discord.HTTPException as e:
-                return await interaction.response.send_message(f"Failed to create a ticket thread: {e}", ephemeral=True)
-
-            new_ticket = Ticket(
-                guild_id=guild.id,
-                user_id=user.id,
-                channel_id=thread.id,
-                ticket_type=ticket_type
-            )
-            session.add(new_ticket)
-            try:
+        try:
+            thread = await base_channel.create_thread(name=f"{ticket_type}-{user.name}", type=ChannelType.private_thread, invitable=False)
+        except discord.HTTPException as e:
+            async with async_session() as session:
+                await session.execute(delete(Ticket).where(Ticket.id == ticket_id))
                 await session.commit()
-            except Exception:
-                await session.rollback()
-                await thread.delete()
-                return await interaction.response.send_message("Patience, my dear. You already have a ticket open. One simply cannot have *all* of my attention at once.", ephemeral=True)
+            if isinstance(e, discord.Forbidden):
+                return await interaction.response.send_message("I cannot create a thread in the configured channel. Please check my permissions.", ephemeral=True)
+            return await interaction.response.send_message(f"Failed to create a ticket thread: {e}", ephemeral=True)
 
-            await thread.send(f"So, {user.mention}. You require my attention regarding... *{ticket_type}*. Very well. A member of my staff will be with you shortly. Do try to be... *interesting*.")
-            await interaction.response.send_message(f"A private audience has been granted. You may present your case in {thread.mention}.", ephemeral=True)
+        opened_at = discord.utils.utcnow()
+        async with async_session() as session:
+            await session.execute(update(Ticket).where(Ticket.id == ticket_id).values(channel_id=thread.id))
+            await bump_daily_stats(session, guild.id, ticket_type, opened_at, opened=1)
+            await session.commit()
+
+        tickets_cog = self.bot.get_cog("Tickets")
+        if tickets_cog:
+            tickets_cog.awaiting_response[thread.id] = AwaitingResponse(ticket_id, ticket_type, user.id, opened_at)
+
+        await thread.send(f"So, {user.mention}. You require my attention regarding... *{ticket_type}*. Very well. A member of my staff will be with you shortly. Do try to be... *interesting*.")
+        await interaction.response.send_message(f"A private audience has been granted. You may present your case in {thread.mention}.", ephemeral=True)
 
     @ui.button(label="Support", style=ButtonStyle.primary, custom_id="ticket_support")
     async def support_button(self, interaction: Interaction, button: ui.Button):
@@ -118,6 +190,24 @@ class TicketView(ui.View):
 class Tickets(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
+        # Transcript jobs still running, held so they aren't garbage collected mid-archive
+        self._archive_tasks: set[asyncio.Task] = set()
+        # thread_id -> open ticket still waiting on staff, so other messages are ignored without a query
+        self.awaiting_response: dict[int, AwaitingResponse] = {}
+
+    async def cog_load(self):
+        async with async_session() as session:
+            result = await session.execute(
+                select(Ticket).where(
+                    Ticket.status == "open",
+                    Ticket.first_response_at.is_(None),
+                    Ticket.channel_id != PENDING_CHANNEL_ID
+                )
+            )
+            self.awaiting_response = {
+                ticket.channel_id: AwaitingResponse(ticket.id, ticket.ticket_type, ticket.user_id, _as_utc(ticket.created_at))
+                for ticket in result.scalars()
+            }
 
     ticket_group = app_commands.Group(
         name="ticket", description="Ticket commands")
@@ -280,6 +370,15 @@ class Tickets(commands.Cog):
                 embed.add_field(name="Adjudicator",
                                 value=closer.mention, inline=True)
 
+            closed_at = discord.utils.utcnow()
+            await bump_daily_stats(
+                session, guild.id, ticket.ticket_type, closed_at,
+                closed=1, close_seconds=(closed_at - _as_utc(ticket.created_at)).total_seconds()
+            )
+            await session.commit()
+            self.awaiting_response.pop(channel.id, None)
+
+            log_channel = None
             log_config = await session.get(TicketLogChannel, guild.id)
             if log_config and log_config.channel_id:
                 log_channel = guild.get_channel(log_config.channel_id)
@@ -290,9 +389,104 @@ class Tickets(commands.Cog):
                         pass
                     except discord.HTTPException:
                         pass
+                else:
+                    log_channel = None
 
+        # The transcript is archived and the thread deleted in the background
+        self.archive_ticket(channel, ticket.id, log_channel)
         await interaction.response.send_message("The curtain falls. The matter is concluded. The ticket is closed.", ephemeral=True)
-        await channel.delete()
+
+    def archive_ticket(self, thread: Thread, ticket_id: int, log_channel: TextChannel | None):
+        task = asyncio.create_task(self._archive_ticket(thread, ticket_id, log_channel))
+        self._archive_tasks.add(task)
+        task.add_done_callback(self._archive_tasks.discard)
+
+    async def _archive_ticket(self, thread: Thread, ticket_id: int, log_channel: TextChannel | None):
+        transcript = await archive_and_delete(
+            thread, f"ticket-{ticket_id}-{thread.id}", log_channel,
+            f"The record of ticket #{ticket_id}, preserved for posterity"
+        )
+        if transcript is None:
+            return
+
+        async with async_session() as session:
+            await session.execute(
+                update(Ticket).where(Ticket.id == ticket_id).values(
+                    transcript_path=os.path.relpath(transcript.jsonl_path, BASE_DIR))
+            )
+            await session.commit()
+
+    @app_commands.command(name="ticketstats", description="Show ticket volume, staff response times and the open backlog.")
+    @app_commands.describe(days="How many days back to look (default 30)")
+    @app_commands.guild_only()
+    @require_role(1)
+    async def ticket_stats(self, interaction: Interaction, days: app_commands.Range[int, 1, 365] = 30):
+        guild = interaction.guild
+        since = (discord.utils.utcnow() - datetime.timedelta(days=days - 1)).date()
+
+        async with async_session() as session:
+            window = await session.execute(
+                select(
+                    TicketDailyStats.ticket_type,
+                    func.sum(TicketDailyStats.opened),
+                    func.sum(TicketDailyStats.closed),
+                    func.sum(TicketDailyStats.first_responses),
+                    func.sum(TicketDailyStats.first_response_seconds),
+                    func.sum(TicketDailyStats.close_seconds),
+                ).where(
+                    TicketDailyStats.guild_id == guild.id,
+                    TicketDailyStats.day >= since
+                ).group_by(TicketDailyStats.ticket_type)
+            )
+            totals = await session.execute(
+                select(
+                    TicketDailyStats.ticket_type,
+                    func.sum(TicketDailyStats.opened) - func.sum(TicketDailyStats.closed)
+                ).where(TicketDailyStats.guild_id == guild.id).group_by(TicketDailyStats.ticket_type)
+            )
+        stats = {row[0]: row[1:] for row in window.all()}
+        backlog = {ticket_type: open_count for ticket_type, open_count in totals.all() if open_count}
+
+        if not stats and not backlog:
+            return await interaction.response.send_message("Not a single petition in all that time. How terribly... *quiet*.", ephemeral=True)
+
+        embed = Embed(
+            title="The Ledger of Petitions",
+            description=f"The last {days} day{'s' if days != 1 else ''}, and every matter still awaiting my attention.",
+            color=discord.Color.purple()
+        )
+        for ticket_type in sorted(set(stats) | set(backlog)):
+            opened, closed, responses, response_seconds, close_seconds = stats.get(ticket_type, (0, 0, 0, 0, 0))
+            lines = [f"**Opened:** {opened} · **Closed:** {closed} · **Still open:** {backlog.get(ticket_type, 0)}"]
+            if responses:
+                lines.append(f"**First staff reply:** {_format_seconds(response_seconds / responses)} on average")
+            if closed:
+                lines.append(f"**Time to close:** {_format_seconds(close_seconds / closed)} on average")
+            embed.add_field(name=ticket_type, value="\n".join(lines), inline=False)
+
+        await interaction.response.send_message(embed=embed, ephemeral=True)
+
+    @commands.Cog.listener()
+    async def on_message(self, message: discord.Message):
+        pending = self.awaiting_response.get(message.channel.id)
+        if pending is None or message.author.bot or message.author.id == pending.user_id:
+            return
+        if get_highest_role_level(message.author) < STAFF_RESPONSE_LEVEL:
+            return
+
+        del self.awaiting_response[message.channel.id]
+        responded_at = message.created_at
+        async with async_session() as session:
+            result = await session.execute(
+                update(Ticket).where(Ticket.id == pending.ticket_id, Ticket.first_response_at.is_(None))
+                .values(first_response_at=responded_at)
+            )
+            if result.rowcount:
+                await bump_daily_stats(
+                    session, message.guild.id, pending.ticket_type, responded_at,
+                    first_responses=1, first_response_seconds=(responded_at - pending.opened_at).total_seconds()
+                )
+            await session.commit()
 
     @app_commands.command(name="setticketlogs", description="Set the channel where ticket close logs will be sent.")
     @app_commands.checks.has_permissions(administrator=True)
@@ -94,6 +94,29 @@ class ExcludedChannel(Base):
     channel_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
 
 
+class PartnershipStaffRole(Base):
+    """Role brought into every partnership ticket of its guild"""
+    __tablename__ = "partnership_staff_roles"
+
+    guild_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    role_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+
+
+class LockdownSnapshot(Base):
+    """@everyone overwrite and slowmode of a channel, saved before a lockdown"""
+    __tablename__ = "lockdown_snapshots"
+
+    guild_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    channel_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    # Whether the channel had an @everyone overwrite at all; an empty one still counts
+    has_overwrite: Mapped[bool] = mapped_column(Boolean, nullable=False)
+    overwrite_allow: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    overwrite_deny: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
+    slowmode_delay: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    created_at: Mapped[datetime] = mapped_column(
+        DateTime(timezone=True), server_default=func.now())
+
+
 class Reminder(Base):
     __tablename__ = "reminders"
 
@@ -102,12 +125,55 @@ class Reminder(Base):
     message: Mapped[str] = mapped_column(Text, nullable=False)
     is_continuous: Mapped[bool] = mapped_column(Boolean, nullable=False, default=False)
     duration_seconds: Mapped[int] = mapped_column(Integer, nullable=False)
+    # Legacy rule string, only read to backfill the structured columns below
     recurrence_rule: Mapped[str | None] = mapped_column(String(100), nullable=True)
-    next_trigger: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
+    interval_seconds: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Bit 0 = Monday
+    weekday_mask: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    # Seconds past midnight UTC
+    time_of_day: Mapped[int | None] = mapped_column(Integer, nullable=True)
+    next_trigger: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+    # Instance currently delivering the reminder, and when its claim lapses
+    claim_owner: Mapped[str | None] = mapped_column(String(100), nullable=True)
+    lease_expires_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     created_at: Mapped[datetime] = mapped_column(
         DateTime(timezone=True), server_default=func.now())
 
 
+class ReactionRole(Base):
+    """Role granted for reacting to a message with an emoji"""
+    __tablename__ = "reaction_roles"
+
+    message_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    emoji: Mapped[str] = mapped_column(String(100), primary_key=True)
+    # Unknown for mappings imported from the old JSON file
+    guild_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    channel_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    role_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    # When the message's reactions were last reconciled with its role holders
+    reconciled_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
+class PanelRole(Base):
+    """Role handed out by a self-role panel, which is therefore kept out of reaction roles"""
+    __tablename__ = "panel_roles"
+
+    role_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    guild_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    # The panel it was last put on
+    message_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
+
+
+class DMChannel(Base):
+    """A user's DM channel, so reminders can be sent without fetching the user or opening the DM again"""
+    __tablename__ = "dm_channels"
+
+    user_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    channel_id: Mapped[int | None] = mapped_column(BigInteger, nullable=True)
+    # Set when the user's DMs refused a reminder; they are not tried again before then
+    closed_until: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+
+
 async def init_db():
     """Initialize Database"""
     from sqlalchemy import text
@@ -117,6 +183,42 @@ async def init_db():
             await conn.execute(text("ALTER TABLE reminders ADD COLUMN recurrence_rule VARCHAR(100)"))
         except Exception:
             pass
+        for column, column_type in (
+            ("interval_seconds", "INTEGER"),
+            ("weekday_mask", "INTEGER"),
+            ("time_of_day", "INTEGER"),
+            ("claim_owner", "VARCHAR(100)"),
+            ("lease_expires_at", "DATETIME"),
+        ):
+            try:
+                await conn.execute(text(f"ALTER TABLE reminders ADD COLUMN {column} {column_type}"))
+            except Exception:
+                pass
+        try:
+            await conn.execute(text("ALTER TABLE reaction_roles ADD COLUMN reconciled_at DATETIME"))
+        except Exception:
+            pass
+        # create_all only indexes new tables; existing databases get the scheduler's index here
+        await conn.execute(text("CREATE INDEX IF NOT EXISTS ix_reminders_next_trigger ON reminders (next_trigger)"))
+
+        # Backfill structured recurrence columns from legacy rule strings
+        from utils.reminder_parser import Recurrence
+        legacy = await conn.execute(text(
+            "SELECT id, recurrence_rule FROM reminders "
+            "WHERE recurrence_rule IS NOT NULL AND interval_seconds IS NULL AND weekday_mask IS NULL"
+        ))
+        for reminder_id, rule in legacy.all():
+            recurrence = Recurrence.from_rule(rule)
+            if recurrence is None:
+                continue
+            await conn.execute(
+                text(
+                    "UPDATE reminders SET interval_seconds = :interval, weekday_mask = :mask, time_of_day = :tod, "
+                    "recurrence_rule = NULL WHERE id = :id"
+                ),
+                {"interval": recurrence.interval_seconds, "mask": recurrence.weekday_mask,
+                 "tod": recurrence.time_of_day, "id": reminder_id}
+            )
 
 
 async def close_db():
@@ -1,10 +1,10 @@
 # pylint: disable=not-callable
 
 import os
-from datetime import datetime
+from datetime import date, datetime
 from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession, async_sessionmaker
 from sqlalchemy.orm import declarative_base, Mapped, mapped_column
-from sqlalchemy import Integer, BigInteger, String, DateTime
+from sqlalchemy import Integer, BigInteger, String, DateTime, Date, Float, Index, text
 from sqlalchemy.sql import func
 
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -30,6 +30,10 @@ class TicketChannel(Base):
 class Ticket(Base):
     """Generic ticket supporting multiple types: Support, Suggestion, Report, Partnership"""
     __tablename__ = "tickets"
+    __table_args__ = (
+        # One open ticket per user per guild, enforced by the database rather than a SELECT before INSERT
+        Index("uq_tickets_open_user", "guild_id", "user_id", unique=True, sqlite_where=text("status = 'open'")),
+    )
 
     id: Mapped[int] = mapped_column(Integer, primary_key=True)
     guild_id: Mapped[int] = mapped_column(BigInteger, nullable=False)
@@ -43,6 +47,27 @@ class Ticket(Base):
         DateTime(timezone=True), nullable=True)
     ad_message_id: Mapped[int | None] = mapped_column(
         BigInteger, nullable=True)
+    # Archived JSONL transcript, relative to the bot directory
+    transcript_path: Mapped[str | None] = mapped_column(
+        String(255), nullable=True)
+    # When staff first replied in the thread
+    first_response_at: Mapped[datetime | None] = mapped_column(
+        DateTime(timezone=True), nullable=True)
+
+
+class TicketDailyStats(Base):
+    """Per-day ticket counters, updated as tickets open, get their first staff reply and close"""
+    __tablename__ = "ticket_daily_stats"
+
+    guild_id: Mapped[int] = mapped_column(BigInteger, primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    ticket_type: Mapped[str] = mapped_column(String(50), primary_key=True)
+    opened: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    closed: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    first_responses: Mapped[int] = mapped_column(Integer, nullable=False, default=0)
+    # Totals in seconds; averages are these divided by first_responses and closed
+    first_response_seconds: Mapped[float] = mapped_column(Float, nullable=False, default=0)
+    close_seconds: Mapped[float] = mapped_column(Float, nullable=False, default=0)
 
 
 class TicketLogChannel(Base):
@@ -57,6 +82,44 @@ async def init_tickets_db():
     """Initialize Tickets Database"""
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.create_all)
+        for column, column_type in (
+            ("transcript_path", "VARCHAR(255)"),
+            ("first_response_at", "DATETIME"),
+        ):
+            try:
+                await conn.execute(text(f"ALTER TABLE tickets ADD COLUMN {column} {column_type}"))
+            except Exception:
+                pass
+        # create_all only indexes new tables. Older databases may already hold duplicate open tickets,
+        # so all but the newest of each are closed before the index can be built
+        await conn.execute(text(
+            "UPDATE tickets SET status = 'closed', closed_at = CURRENT_TIMESTAMP "
+            "WHERE status = 'open' AND id NOT IN "
+            "(SELECT MAX(id) FROM tickets WHERE status = 'open' GROUP BY guild_id, user_id)"
+        ))
+        await conn.execute(text(
+            "CREATE UNIQUE INDEX IF NOT EXISTS uq_tickets_open_user ON tickets (guild_id, user_id) WHERE status = 'open'"
+        ))
+
+        # Seed the daily stats from ticket history the first time they exist; later events keep them current
+        has_stats = (await conn.execute(text("SELECT 1 FROM ticket_daily_stats LIMIT 1"))).first()
+        if not has_stats:
+            await conn.execute(text(
+                "INSERT INTO ticket_daily_stats "
+                "(guild_id, day, ticket_type, opened, closed, first_responses, first_response_seconds, close_seconds) "
+                "SELECT guild_id, date(created_at), ticket_type, COUNT(*), 0, 0, 0, 0 "
+                "FROM tickets WHERE channel_id != 0 GROUP BY guild_id, date(created_at), ticket_type"
+            ))
+            await conn.execute(text(
+                "INSERT INTO ticket_daily_stats "
+                "(guild_id, day, ticket_type, opened, closed, first_responses, first_response_seconds, close_seconds) "
+                "SELECT guild_id, date(closed_at), ticket_type, 0, COUNT(*), 0, 0, "
+                "SUM((julianday(closed_at) - julianday(created_at)) * 86400) "
+                "FROM tickets WHERE status = 'closed' AND closed_at IS NOT NULL "
+                "GROUP BY guild_id, date(closed_at), ticket_type "
+                "ON CONFLICT (guild_id, day, ticket_type) DO UPDATE SET "
+                "closed = excluded.closed, close_seconds = excluded.close_seconds"
+            ))
 
 
 async def close_tickets_db():
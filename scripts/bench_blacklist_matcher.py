@@ -0,0 +1,140 @@
+"""
+Benchmarks utils/blacklist_matcher.py against the one-regex-per-word search it replaced, and checks on seeded
+random text that both flag exactly the same messages. Also times feed(), which catches words split across a
+user's messages, against rescanning the joined buffer of their recent messages as AutoMod used to.
+
+AutoMod, the matcher's only caller, is disabled (cogs/automod.py is commented out), so this exercises the matcher
+directly. The static patterns are read from utils/regex_patterns.py, which is commented out along with it.
+
+    python -m scripts.bench_blacklist_matcher
+"""
+import os
+import random
+import re
+import string
+import sys
+import timeit
+from collections import deque
+
+from utils.blacklist_matcher import SEPARATOR, BlacklistMatcher
+
+PATTERNS_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "utils", "regex_patterns.py")
+
+CLEAN_MESSAGE = "good morning my friends, what a lovely view we got today " * 4
+FUZZ_ALPHABET = "abcdefghijklmnopqrstuvwxyzFUCK .,!_-*1Ié"
+SPLIT_ALPHABET = "abcdefghiklmnopqrstuvwxyz .,!"
+
+# Messages per user AutoMod kept and rescanned together (MAX_BUFFER in config/automod_config.py)
+MAX_BUFFER = 5
+
+
+def static_patterns() -> list[str]:
+    with open(PATTERNS_FILE, encoding="utf-8") as f:
+        return re.findall(r'r"([^"]+)"', f.read())
+
+
+def word_to_flexible_regex(word: str) -> str:
+    """How utils/load_blacklist.py turns a dynamic word into a pattern."""
+    return SEPARATOR.join(re.escape(ch) for ch in word)
+
+
+def random_words(count: int, rng: random.Random) -> list[str]:
+    return ["".join(rng.choice(string.ascii_lowercase) for _ in range(rng.randint(4, 9))) for _ in range(count)]
+
+
+def legacy_search(compiled: list[re.Pattern], text: str) -> bool:
+    """The old check: every pattern searched over the text in turn."""
+    return any(pattern.search(text) for pattern in compiled)
+
+
+def mismatches(compiled: list[re.Pattern], matcher: BlacklistMatcher, rng: random.Random, count: int = 3000) -> int:
+    found = 0
+    for _ in range(count):
+        text = "".join(rng.choice(FUZZ_ALPHABET) for _ in range(rng.randint(0, 60)))
+        match = matcher.search(text)
+        if legacy_search(compiled, text) != (match is not None):
+            found += 1
+        elif match and re.sub(r"[^\w]+", "", text[match.start:match.end]).lower() != match.term:
+            found += 1  # The reported span must cover the word that was found
+    return found
+
+
+def first_split_match(matcher: BlacklistMatcher, messages: list[str]) -> int | None:
+    """Index of the message that completes a blacklisted word, fed one message at a time."""
+    tail = ""
+    for index, message in enumerate(messages):
+        match, tail = matcher.feed(message, tail)
+        if match:
+            return index
+    return None
+
+
+def split_mismatches(matcher: BlacklistMatcher, rng: random.Random, count: int = 3000) -> int:
+    """Compares feed() with searching everything the user has said so far, joined."""
+    found = 0
+    for _ in range(count):
+        messages = [
+            "".join(rng.choice(SPLIT_ALPHABET) for _ in range(rng.randint(0, 8))) for _ in range(rng.randint(1, 6))
+        ]
+        expected = next((i for i in range(len(messages)) if matcher.search(" ".join(messages[:i + 1]))), None)
+        if first_split_match(matcher, messages) != expected:
+            found += 1
+    return found
+
+
+def bench_split(matcher: BlacklistMatcher, messages: list[str]) -> tuple[float, float]:
+    """Microseconds per message for rescanning the recent-message buffer, and for feed()."""
+    def rescan():
+        buffer = deque(maxlen=MAX_BUFFER)
+        for message in messages:
+            buffer.append(message)
+            matcher.search(" ".join(buffer))
+
+    def feed():
+        tail = ""
+        for message in messages:
+            _, tail = matcher.feed(message, tail)
+
+    return per_call(rescan, 20) / len(messages), per_call(feed, 20) / len(messages)
+
+
+def per_call(func, number: int = 2000) -> float:
+    return min(timeit.repeat(func, number=number, repeat=5)) / number * 1e6
+
+
+def main() -> int:
+    rng = random.Random(48)
+    patterns = static_patterns()
+    extra_words = random_words(2000, rng)
+    assert not BlacklistMatcher((), patterns).search(CLEAN_MESSAGE)
+
+    failures = 0
+    print(f"{len(patterns)} static patterns")
+    for word_count in (0, 200, 2000):
+        words = extra_words[:word_count]
+        compiled = [re.compile(p, re.IGNORECASE | re.DOTALL) for p in patterns + [word_to_flexible_regex(w) for w in words]]
+        matcher = BlacklistMatcher(words, patterns)
+        bad = mismatches(compiled, matcher, rng)
+        failures += bad
+
+        old_us = per_call(lambda: legacy_search(compiled, CLEAN_MESSAGE))
+        new_us = per_call(lambda: matcher.search(CLEAN_MESSAGE))
+        print(
+            f"+{word_count:>4} words: per-pattern {old_us:8.1f}µs   matcher {new_us:6.1f}µs   "
+            f"{old_us / new_us:6.1f}x   mismatches {bad}"
+        )
+
+    matcher = BlacklistMatcher(extra_words[:200], patterns)
+    bad = split_mismatches(matcher, rng)
+    failures += bad
+    stream = [CLEAN_MESSAGE[i:i + 60] for i in range(0, len(CLEAN_MESSAGE), 60)] * 250
+    rescan_us, feed_us = bench_split(matcher, stream)
+    print(
+        f"split words, per message: rescan last {MAX_BUFFER} {rescan_us:6.1f}µs   feed {feed_us:6.1f}µs   "
+        f"{rescan_us / feed_us:6.1f}x   mismatches {bad}"
+    )
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
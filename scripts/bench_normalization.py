@@ -0,0 +1,90 @@
+"""
+Benchmarks utils/normalization.py against the chain of lower/NFKD/replace/re.sub calls it replaced, and checks
+that it only ever differs from it by keeping letters the old chain threw away (look-alikes from other scripts,
+and letters such as ø or ł that have no decomposition).
+
+    python -m scripts.bench_normalization
+"""
+import random
+import re
+import sys
+import timeit
+import unicodedata
+
+from utils.normalization import normalize, normalize_many
+
+ASCII_ALPHABET = "abcdefghijklmnopqrstuvwxyzABCDEFXYZ 0123456789!@$.,?'"
+MIXED_ALPHABET = ASCII_ALPHABET + "éèçñüÅ😀"
+
+
+def legacy_normalize(text: str) -> str:
+    """The normalizer as it was, kept as the reference."""
+    text = text.lower()
+    text = unicodedata.normalize('NFKD', text).encode(
+        'ascii', 'ignore').decode('ascii')
+
+    replacements = {
+        "4": "a", "@": "a", "3": "e", "1": "i", "!": "i",
+        "0": "o", "$": "s", "5": "s", "7": "t", "ƒ": "f", "ß": "b", "ç": "c"
+    }
+
+    for k, v in replacements.items():
+        text = text.replace(k, v)
+
+    return re.sub(r'[^a-z0-9]', '', text)
+
+
+def is_subsequence(short: str, long: str) -> bool:
+    remaining = iter(long)
+    return all(ch in remaining for ch in short)
+
+
+def character_differences() -> tuple[int, list[str]]:
+    """Characters folded differently, and those whose difference is not just a letter being kept."""
+    differing, wrong = 0, []
+    for codepoint in range(0x30000):
+        if 0xD800 <= codepoint < 0xE000:
+            continue
+        ch = chr(codepoint)
+        old, new = legacy_normalize(ch), normalize.__wrapped__(ch)
+        if old != new:
+            differing += 1
+            if not new or not is_subsequence(old, new):
+                wrong.append(f"{ch!r}: {old!r} -> {new!r}")
+    return differing, wrong
+
+
+def messages(alphabet: str, rng: random.Random, count: int = 5000) -> list[str]:
+    return ["".join(rng.choice(alphabet) for _ in range(rng.randint(5, 200))) for _ in range(count)]
+
+
+def per_message(func, texts: list[str]) -> float:
+    return min(timeit.repeat(lambda: func(texts), number=1, repeat=5)) / len(texts) * 1e6
+
+
+def main() -> int:
+    rng = random.Random(50)
+    differing, wrong = character_differences()
+    print(f"characters folded differently: {differing}, of which not just a kept letter: {len(wrong)}")
+    for line in wrong[:20]:
+        print("   ", line)
+
+    mixed = messages(MIXED_ALPHABET, rng)
+    message_mismatches = sum(legacy_normalize(text) != normalize.__wrapped__(text) for text in mixed)
+    print(f"messages folded differently: {message_mismatches} of {len(mixed)}")
+
+    for label, texts in (("ascii", messages(ASCII_ALPHABET, rng)), ("mixed", mixed)):
+        old_us = per_message(lambda batch: [legacy_normalize(t) for t in batch], texts)
+        new_us = per_message(lambda batch: [normalize.__wrapped__(t) for t in batch], texts)
+        batch_us = per_message(normalize_many, texts)
+        print(f"{label}: legacy {old_us:5.2f}µs   normalize {new_us:5.2f}µs   normalize_many {batch_us:5.2f}µs per message")
+
+    repeated = mixed[:500]
+    for text in repeated:
+        normalize(text)
+    print(f"cache hit: {per_message(lambda batch: [normalize(t) for t in batch], repeated):5.2f}µs per message")
+    return 1 if wrong or message_mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
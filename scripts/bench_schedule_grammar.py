@@ -0,0 +1,50 @@
+"""
+Times utils/schedule_grammar.py against the parsers it replaced (scripts/legacy_schedule_parser.py), on the
+common inputs users actually type and on a stream of distinct ones that always miss the cache.
+
+    python -m scripts.bench_schedule_grammar [repeat]
+"""
+import datetime
+import sys
+import timeit
+
+from cogs.moderation import parse_duration
+from scripts import legacy_schedule_parser as legacy
+from scripts.fuzz_schedule_grammar import CORPUS, generate
+from utils.reminder_parser import parse_reminder_input
+
+COMMON = [
+    "10m", "1h30m", "2d", "every 10m", "every monday at 10am", "every weekday at 9am", "daily at 21:00",
+    "tomorrow at 3pm", "today at 8pm", "next friday 5pm", "2030-08-01 15:30",
+]
+NOW = datetime.datetime(2026, 10, 19, 8, 59, 30, tzinfo=datetime.timezone.utc)
+
+
+def per_call(func, inputs: list[str], repeat: int) -> float:
+    """Best microseconds per parse over `repeat` passes through `inputs`."""
+    timer = timeit.Timer(lambda: [func(text) for text in inputs])
+    return min(timer.repeat(repeat, number=1)) / len(inputs) * 1e6
+
+
+def report(label: str, new, old, inputs: list[str], repeat: int):
+    new_us = per_call(new, inputs, repeat)
+    old_us = per_call(old, inputs, repeat)
+    print(f"{label:<34} legacy {old_us:7.2f}µs   grammar {new_us:7.2f}µs   {old_us / new_us:5.1f}x")
+
+
+def main(repeat: int = 20) -> int:
+    common = COMMON * 100
+    # Fresh strings each pass, so nothing is served from the grammar's caches
+    distinct = [f"{text} {i}" for i, text in enumerate(CORPUS + generate(2000, 1))]
+
+    report("reminders, common inputs", lambda t: parse_reminder_input(t, False, NOW),
+           lambda t: legacy.parse_reminder_input(t, False, NOW), common, repeat)
+    report("reminders, uncached inputs", lambda t: parse_reminder_input(t, False, NOW),
+           lambda t: legacy.parse_reminder_input(t, False, NOW), distinct, 1)
+    report("moderation durations", parse_duration, legacy.parse_duration,
+           ["10m", "1h30m", "2d", "30min", "2hours", "0s"] * 100, repeat)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(*map(int, sys.argv[1:2])))
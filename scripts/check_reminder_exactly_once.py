@@ -0,0 +1,119 @@
+"""
+Runs several reminder schedulers as separate processes against one SQLite database and checks that every
+reminder is delivered exactly once. Leases are shortened so that each instance's batches take several leases
+to send, which only works if leases are renewed while delivery is still going on.
+
+    python -m scripts.check_reminder_exactly_once [instances] [reminders]
+"""
+import asyncio
+import collections
+import datetime
+import os
+import subprocess
+import sys
+import tempfile
+import time
+from types import SimpleNamespace
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+import cogs.reminders as reminders
+from database.database import Base, Reminder
+
+LEASE = datetime.timedelta(seconds=2)
+RUN_LIMIT = 120
+
+
+def make_engine(path: str):
+    return create_async_engine(f"sqlite+aiosqlite:///{path}", connect_args={"timeout": 30})
+
+
+async def seed(path: str, count: int):
+    """Half the reminders are due in a few seconds, half were missed long ago and go through the backlog drain."""
+    engine = make_engine(path)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+    now = datetime.datetime.now(datetime.timezone.utc)
+    async with async_sessionmaker(engine)() as session:
+        for i in range(count):
+            due = now + datetime.timedelta(seconds=3) if i % 2 else now - datetime.timedelta(hours=1, seconds=i)
+            session.add(Reminder(user_id=i % 40, message=f"reminder {i}", is_continuous=False,
+                                 duration_seconds=0, next_trigger=due))
+        await session.commit()
+    await engine.dispose()
+
+
+class FakeChannel:
+    id = 1
+
+    def __init__(self, log):
+        self.log = log
+
+    async def send(self, embeds, view=None):
+        for embed in embeds:
+            self.log.write(embed.footer.text.rsplit(" ", 1)[-1] + "\n")
+        self.log.flush()
+
+
+async def worker(path: str, log_path: str):
+    engine = make_engine(path)
+    reminders.async_session = async_sessionmaker(engine, expire_on_commit=False)
+    reminders.REMINDER_LEASE = LEASE
+    reminders.REMINDER_LEASE_RENEWAL = LEASE / 4
+
+    with open(log_path, "w") as log:
+        channel = FakeChannel(log)
+        bot = SimpleNamespace(
+            wait_until_ready=lambda: asyncio.sleep(0),
+            add_dynamic_items=lambda *items: None,
+            remove_dynamic_items=lambda *items: None,
+            get_user=lambda user_id: SimpleNamespace(id=user_id, dm_channel=channel),
+            get_partial_messageable=lambda channel_id, type=None: channel,
+        )
+        cog = reminders.Reminders(bot)
+        await cog.cog_load()
+
+        deadline = time.monotonic() + RUN_LIMIT
+        while time.monotonic() < deadline:
+            await asyncio.sleep(0.5)
+            async with reminders.async_session() as session:
+                if not await session.scalar(select(func.count()).select_from(Reminder)):
+                    break
+        cog.cog_unload()
+    await engine.dispose()
+
+
+def main(instances: int = 3, count: int = 200) -> int:
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "reminders.db")
+        asyncio.run(seed(path, count))
+
+        logs = [os.path.join(directory, f"instance{n}.log") for n in range(instances)]
+        processes = [
+            subprocess.Popen([sys.executable, "-m", "scripts.check_reminder_exactly_once", "worker", path, log])
+            for log in logs
+        ]
+        for process in processes:
+            process.wait()
+
+        per_instance = []
+        deliveries = collections.Counter()
+        for log in logs:
+            with open(log) as f:
+                ids = [int(line) for line in f if line.strip()]
+            per_instance.append(len(ids))
+            deliveries.update(ids)
+
+    duplicated = sorted(i for i, n in deliveries.items() if n > 1)
+    missing = count - len(deliveries)
+    print(f"{count} reminders, {instances} instances, delivered per instance: {per_instance}")
+    print(f"duplicated: {len(duplicated)} {duplicated[:20]}  missing: {missing}")
+    return 1 if duplicated or missing else 0
+
+
+if __name__ == "__main__":
+    if sys.argv[1:2] == ["worker"]:
+        asyncio.run(worker(sys.argv[2], sys.argv[3]))
+    else:
+        sys.exit(main(*map(int, sys.argv[1:3])))
@@ -0,0 +1,92 @@
+"""
+Checks utils/schedule_grammar.py against the parsers it replaced (scripts/legacy_schedule_parser.py) on a fixed
+corpus of real-world inputs plus seeded random ones, at several reference times. Exits non-zero on any mismatch.
+
+    python -m scripts.fuzz_schedule_grammar [count] [seed]
+"""
+import datetime
+import random
+import re
+import sys
+
+from cogs.moderation import parse_duration
+from scripts import legacy_schedule_parser as legacy
+from utils.reminder_parser import parse_reminder_input
+from utils.schedule_grammar import parse_days_list, parse_duration_to_seconds, parse_time_of_day
+
+CORPUS = [
+    "10m", "2h", "1d12h", "1h30m", "1h 30m", "90s", "0s", "0m", "3w", "1d 2h 3m 4s", "  5m  ", "5M", "10",
+    "30min", "1hr", "2hours", "1h 30", "5 m", "m5", "1x", "", " ", "-5m", "1.5h", "99999999d",
+    "every 10m", "every 2h30m", "repeat 1d", "every day", "every days", "everyday", "everyday at 8am", "daily",
+    "daily at 21:00", "every monday", "every monday at 10am", "every mon and wed at 3:30pm", "every sat, sun at 9",
+    "every weekday at 9am", "every weekends at 11:00", "every tues & thurs at 07:15", "every fri or sat at 12am",
+    "every 0m", "every funday", "repeat monday at 25:00", "every monday at 13pm",
+    "tomorrow", "tomorrow at 3pm", "today at 8pm", "today 23:59", "today at 00:00", "tomorrow 12am", "today at noon",
+    "monday at 10am", "next friday 5pm", "sun", "wed at 9:05:30", "next tue at 0:00", "thursday at 12pm",
+    "2026-08-01", "2026-08-01 15:30", "2030-02-29 10:00", "2030-12-31 23:59:59", "2020-01-01 09:00", "2030-13-01",
+    "10am", "3:30 PM", "17:00", "24:00", "12:60", "0am", "weekdays", "sat, sun", "monday and wednesday",
+]
+
+TOKENS = [
+    "every ", "repeat ", "daily", "everyday", "day", "days", "weekday", "weekend", "weekdays", " at ", "at ", " ",
+    ", ", " and ", " or ", "&", "today", "tomorrow", "next ", "mon", "monday", "tue", "tues", "wed", "thurs",
+    "fri", "sat", "sunday", "am", "pm", ":", "-", "0", "1", "5", "9", "12", "15", "30", "59", "60", "2026",
+    "2031", "s", "m", "h", "d", "w", "min", "hr", "hours", "x",
+    # Whitespace, digits and words that only the tokenizer has to get right
+    "\t", "  ", " at  ", "٣", "sand", "thorsun", "sunny", "everydays", "dailyx", "morning", "xtoday", "ampm", "2026-",
+]
+
+NOWS = [
+    datetime.datetime(2026, 10, 19, 8, 59, 30, tzinfo=datetime.timezone.utc),
+    datetime.datetime(2026, 12, 31, 23, 59, 59, tzinfo=datetime.timezone.utc),
+    datetime.datetime(2028, 2, 29, 12, 0, tzinfo=datetime.timezone.utc),
+]
+
+# Timeouts gained the week unit when moderation moved onto the shared grammar; the old parser ignored it
+_WEEK_UNIT = re.compile(r"\d+w")
+
+
+def generate(count: int, seed: int) -> list[str]:
+    rng = random.Random(seed)
+    return ["".join(rng.choice(TOKENS) for _ in range(rng.randint(1, 6))) for _ in range(count)]
+
+
+def outcome(parser, *args):
+    """The parser's result, or the type of the error it raised, so that failing alike also counts as agreeing."""
+    try:
+        return parser(*args)
+    except Exception as e:
+        return type(e).__name__
+
+
+def mismatches(text: str) -> list[str]:
+    found = []
+    for now in NOWS:
+        for continuous in (False, True):
+            new = outcome(parse_reminder_input, text, continuous, now)
+            old = outcome(legacy.parse_reminder_input, text, continuous, now)
+            if new != old:
+                found.append(f"parse_reminder_input({text!r}, {continuous}, {now:%Y-%m-%d %H:%M:%S}): {new} != {old}")
+
+    pairs = [
+        ("parse_duration_to_seconds", outcome(parse_duration_to_seconds, text), outcome(legacy.parse_duration_to_seconds, text)),
+        ("parse_time_of_day", outcome(parse_time_of_day, text), outcome(legacy.parse_time_of_day, text)),
+        ("parse_days_list", outcome(parse_days_list, text), outcome(legacy.parse_days_list, text)),
+    ]
+    if not _WEEK_UNIT.search(text.lower()):
+        pairs.append(("moderation parse_duration", outcome(parse_duration, text), outcome(legacy.parse_duration, text)))
+    found.extend(f"{name}({text!r}): {new} != {old}" for name, new, old in pairs if new != old)
+    return found
+
+
+def main(count: int = 50_000, seed: int = 34) -> int:
+    inputs = CORPUS + generate(count, seed)
+    failures = [line for text in inputs for line in mismatches(text)]
+    for line in failures[:50]:
+        print(line)
+    print(f"{len(inputs)} inputs, {len(failures)} mismatches")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(*map(int, sys.argv[1:3])))
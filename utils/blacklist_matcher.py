@@ -0,0 +1,155 @@
+import re
+from bisect import bisect_right
+from typing import Iterable, NamedTuple
+
+# What the old per-word patterns allowed between letters: f[^\w]*u[^\w]*c[^\w]*k
+SEPARATOR = r"[^\w]*"
+_SEPARATORS = re.compile(r"[^\w]+")
+_WORD_RUNS = re.compile(r"\w+")
+
+
+class BlacklistMatch(NamedTuple):
+    """A blacklisted term found in a text, with `start`/`end` offsets into the original text."""
+    term: str
+    start: int
+    end: int
+
+
+def pattern_to_word(pattern: str) -> str | None:
+    """The word behind a separator-tolerant pattern like f[^\\w]*u[^\\w]*c[^\\w]*k, or None for any other regex."""
+    word = pattern.replace(SEPARATOR, "")
+    return word.lower() if _WORD_RUNS.fullmatch(word) else None
+
+
+def _trie_regex(words: Iterable[str]) -> str:
+    """
+    One alternation shaped like a trie (f(?:ag|uck)|s(?:hit|lut)...), so each position of the text costs
+    a walk down one branch rather than a try of every word. A word that has another blacklisted word as a
+    prefix adds nothing, since the shorter word already matches.
+    """
+    trie: dict = {}
+    for word in words:
+        node = trie
+        for ch in word:
+            if "" in node:
+                break
+            node = node.setdefault(ch, {})
+        else:
+            node.clear()
+            node[""] = {}
+
+    def emit(node: dict) -> str:
+        if "" in node:
+            return ""
+        alternatives = [re.escape(ch) + emit(child) for ch, child in sorted(node.items())]
+        return alternatives[0] if len(alternatives) == 1 else f"(?:{'|'.join(alternatives)})"
+
+    return emit(trie)
+
+
+class BlacklistMatcher:
+    """
+    Finds blacklisted words however they are spaced out or punctuated. Separators are stripped from the text
+    in one pass and every word is searched for at once in what remains, so the cost of a search barely grows
+    with the size of the blacklist. Patterns that aren't plain separator-tolerant words are combined into a
+    single regex over the original text.
+
+    AutoMod, its only caller, is disabled for now; scripts/bench_blacklist_matcher.py exercises it directly.
+    """
+
+    def __init__(self, words: Iterable[str] = (), patterns: Iterable[str] = ()):
+        clean_words = set()
+        other_patterns = []
+        for pattern in patterns:
+            word = pattern_to_word(pattern)
+            if word:
+                clean_words.add(word)
+            else:
+                other_patterns.append(pattern)
+        for word in words:
+            word = _SEPARATORS.sub("", word).lower()
+            if word:
+                clean_words.add(word)
+
+        self.words = frozenset(clean_words)
+        # Letters carried between messages: enough to finish the longest word, never a whole one
+        self.tail_length = max(map(len, clean_words), default=1) - 1
+        self._words_source = _trie_regex(clean_words) if clean_words else None
+        # Matching lowercased text is several times faster than IGNORECASE
+        self._words_regex = re.compile(self._words_source) if clean_words else None
+        self._words_regex_ignorecase = None
+        self._patterns_regex = (
+            re.compile("|".join(f"(?:{p})" for p in other_patterns), re.IGNORECASE | re.DOTALL)
+            if other_patterns else None
+        )
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    def search(self, text: str) -> BlacklistMatch | None:
+        """The first blacklisted word in `text`, or None."""
+        if self._words_regex:
+            match = self._search_words(_SEPARATORS.sub("", text))
+            if match:
+                start, end = _original_span(text, match.start(), match.end())
+                return BlacklistMatch(match.group().lower(), start, end)
+
+        if self._patterns_regex:
+            match = self._patterns_regex.search(text)
+            if match:
+                return BlacklistMatch(match.group().lower(), match.start(), match.end())
+        return None
+
+    def feed(self, text: str, tail: str = "") -> tuple[BlacklistMatch | None, str]:
+        """
+        Searches `text` as the continuation of earlier messages whose last letters were `tail`, so a word split
+        across messages is still found while only the new text and the short tail are scanned. Returns the match,
+        if any, and the tail to pass in with the next message, which is empty after a match. A match that began
+        in an earlier message starts at offset 0.
+        """
+        stripped = _SEPARATORS.sub("", text)
+        if self._words_regex:
+            match = self._search_words(tail + stripped)
+            if match:
+                start = match.start() - len(tail)
+                end = match.end() - len(tail)
+                if start < 0:
+                    start = 0
+                    _, end = _original_span(text, 0, end)
+                else:
+                    start, end = _original_span(text, start, end)
+                return BlacklistMatch(match.group().lower(), start, end), ""
+
+        if self._patterns_regex:
+            match = self._patterns_regex.search(text)
+            if match:
+                return BlacklistMatch(match.group().lower(), match.start(), match.end()), ""
+
+        if not self.tail_length:
+            return None, ""
+        return None, (tail + stripped.lower())[-self.tail_length:]
+
+    def _search_words(self, stripped: str) -> re.Match | None:
+        lowered = stripped.lower()
+        if len(lowered) == len(stripped):
+            return self._words_regex.search(lowered)
+        # A few characters lowercase to more than one, which would shift every offset after them
+        if self._words_regex_ignorecase is None:
+            self._words_regex_ignorecase = re.compile(self._words_source, re.IGNORECASE)
+        return self._words_regex_ignorecase.search(stripped)
+
+
+def _original_span(text: str, start: int, end: int) -> tuple[int, int]:
+    """Maps a span of the separator-stripped text back onto `text`. Only runs once a match has been found."""
+    runs = list(_WORD_RUNS.finditer(text))
+    stripped_starts = []
+    position = 0
+    for run in runs:
+        stripped_starts.append(position)
+        position += run.end() - run.start()
+
+    def to_original(offset: int) -> int:
+        index = bisect_right(stripped_starts, offset) - 1
+        return runs[index].start() + offset - stripped_starts[index]
+
+    return to_original(start), to_original(end - 1) + 1
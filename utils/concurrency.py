@@ -0,0 +1,59 @@
+import asyncio
+import time
+from typing import Awaitable, Callable, Iterable, TypeVar
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+async def gather_bounded(
+    items: Iterable[T],
+    func: Callable[[T], Awaitable[R]],
+    limit: int
+) -> list[R | BaseException]:
+    """
+    Runs `func` over `items` with at most `limit` calls in flight.
+    Results are returned in input order; failures are returned as exceptions instead of raised.
+    """
+    semaphore = asyncio.Semaphore(limit)
+
+    async def run(item: T) -> R:
+        async with semaphore:
+            return await func(item)
+
+    return await asyncio.gather(*(run(item) for item in items), return_exceptions=True)
+
+
+class RateLimiter:
+    """
+    Token bucket allowing `rate` calls per `per` seconds across every caller.
+    Background callers only take a token while no urgent caller is waiting for one.
+    """
+
+    def __init__(self, rate: int, per: float):
+        self.capacity = rate
+        self._tokens = float(rate)
+        self._fill_rate = rate / per
+        self._updated = time.monotonic()
+        self._urgent_waiting = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self._fill_rate)
+        self._updated = now
+
+    async def acquire(self, urgent: bool = True):
+        """Waits for a token."""
+        if urgent:
+            self._urgent_waiting += 1
+        try:
+            while True:
+                self._refill()
+                if self._tokens >= 1 and (urgent or not self._urgent_waiting):
+                    self._tokens -= 1
+                    return
+                # Sleep until a token is due, or briefly while urgent callers drain the ones available
+                await asyncio.sleep(max((1 - self._tokens) / self._fill_rate, 0.05))
+        finally:
+            if urgent:
+                self._urgent_waiting -= 1
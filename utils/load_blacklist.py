@@ -5,6 +5,7 @@
 # from pathlib import Path
 # from typing import Iterable, List, Pattern
 
+# from utils.blacklist_matcher import BlacklistMatcher
 # from utils.regex_patterns import BLACKLIST as STATIC_REGEX_PATTERNS
 
 # BLACKLIST_FILE = Path("config/blacklist.json")
@@ -59,6 +60,14 @@
 #     return [re.compile(pat, re.IGNORECASE | re.DOTALL) for pat in all_patterns]
 
 
+# def build_blacklist_matcher() -> BlacklistMatcher:
+#     """
+#     One matcher for the static patterns and the dynamic words, searched in a single pass
+#     instead of one regex per entry.
+#     """
+#     return BlacklistMatcher(_load_dynamic_words(), STATIC_REGEX_PATTERNS)
+
+
 # def save_dynamic_word(word: str) -> List[str]:
 #     words = _load_dynamic_words()
 #     w = word.strip().lower()
@@ -0,0 +1,105 @@
+from bisect import bisect_left, insort
+from collections import defaultdict
+
+import discord
+
+
+def _member_keys(member: discord.Member) -> set[str]:
+    """Returns the lowercased username, nickname and global name of a member."""
+    keys = {member.name.lower()}
+    if member.nick:
+        keys.add(member.nick.lower())
+    if member.global_name:
+        keys.add(member.global_name.lower())
+    return keys
+
+
+class MemberNameIndex:
+    """Per-guild index of lowercased member names, nicknames and global names to member IDs."""
+
+    def __init__(self):
+        self._names: dict[int, dict[str, set[int]]] = defaultdict(dict)
+        # Sorted copy of each guild's keys, used for prefix lookups
+        self._sorted_keys: dict[int, list[str]] = defaultdict(list)
+        self._member_keys: dict[tuple[int, int], set[str]] = {}
+
+    def build(self, guild: discord.Guild):
+        """(Re)builds the index for a guild from its member cache."""
+        self.drop_guild(guild.id)
+        names = self._names[guild.id]
+        for member in guild.members:
+            keys = _member_keys(member)
+            self._member_keys[(guild.id, member.id)] = keys
+            for key in keys:
+                names.setdefault(key, set()).add(member.id)
+        self._sorted_keys[guild.id] = sorted(names)
+
+    def drop_guild(self, guild_id: int):
+        """Forgets every entry for a guild."""
+        names = self._names.pop(guild_id, {})
+        self._sorted_keys.pop(guild_id, None)
+        for member_ids in names.values():
+            for member_id in member_ids:
+                self._member_keys.pop((guild_id, member_id), None)
+
+    def add(self, member: discord.Member):
+        """Indexes a member, replacing any previous entry for them."""
+        self.remove(member.guild.id, member.id)
+        keys = _member_keys(member)
+        self._member_keys[(member.guild.id, member.id)] = keys
+        names = self._names[member.guild.id]
+        sorted_keys = self._sorted_keys[member.guild.id]
+        for key in keys:
+            if key not in names:
+                names[key] = set()
+                insort(sorted_keys, key)
+            names[key].add(member.id)
+
+    def remove(self, guild_id: int, member_id: int):
+        """Removes a member from the index."""
+        keys = self._member_keys.pop((guild_id, member_id), None)
+        if not keys:
+            return
+        names = self._names[guild_id]
+        sorted_keys = self._sorted_keys[guild_id]
+        for key in keys:
+            member_ids = names.get(key)
+            if member_ids is None:
+                continue
+            member_ids.discard(member_id)
+            if not member_ids:
+                del names[key]
+                pos = bisect_left(sorted_keys, key)
+                if pos < len(sorted_keys) and sorted_keys[pos] == key:
+                    del sorted_keys[pos]
+
+    def resolve(self, guild: discord.Guild, name: str) -> discord.Member | None:
+        """Returns a cached member whose username, nickname or global name matches exactly."""
+        for member_id in self._names[guild.id].get(name.lower(), ()):
+            member = guild.get_member(member_id)
+            if member:
+                return member
+        return None
+
+    def complete(self, guild: discord.Guild, prefix: str, limit: int = 25) -> list[discord.Member]:
+        """Returns up to `limit` distinct members with a name starting with `prefix`."""
+        prefix = prefix.lower()
+        names = self._names[guild.id]
+        sorted_keys = self._sorted_keys[guild.id]
+
+        found: dict[int, discord.Member] = {}
+        pos = bisect_left(sorted_keys, prefix)
+        while pos < len(sorted_keys) and len(found) < limit:
+            key = sorted_keys[pos]
+            if not key.startswith(prefix):
+                break
+            for member_id in names[key]:
+                if member_id in found:
+                    continue
+                member = guild.get_member(member_id)
+                if member:
+                    found[member_id] = member
+                    if len(found) >= limit:
+                        break
+            pos += 1
+        return list(found.values())
@@ -0,0 +1,78 @@
+import asyncio
+import logging
+from collections import defaultdict
+
+import discord
+
+from utils.concurrency import RateLimiter, gather_bounded
+
+logger = logging.getLogger("morrible")
+
+# query_members accepts at most 100 user IDs per request
+QUERY_BATCH_SIZE = 100
+
+
+class MemberResolver:
+    """
+    Resolves guild members from what is already at hand: the event's member, then the member cache.
+    Misses are gathered for `batch_delay` seconds and looked up together with rate-limited
+    gateway member queries, so a burst of reactions costs a handful of requests instead of one each.
+    """
+
+    def __init__(self, batch_delay: float = 0.5, queries_per_second: int = 2):
+        self.batch_delay = batch_delay
+        self._limiter = RateLimiter(queries_per_second, 1)
+        # guild_id -> user_id -> future shared by everyone waiting on that member
+        self._pending: dict[int, dict[int, asyncio.Future]] = defaultdict(dict)
+        self._flush_tasks: dict[int, asyncio.Task] = {}
+
+    async def resolve(
+        self, guild: discord.Guild, user_id: int, member: discord.Member | None = None
+    ) -> discord.Member | None:
+        """Returns the member, or None if they are no longer in the guild."""
+        if member:
+            return member
+        cached = guild.get_member(user_id)
+        if cached:
+            return cached
+
+        pending = self._pending[guild.id]
+        future = pending.get(user_id)
+        if future is None:
+            future = asyncio.get_running_loop().create_future()
+            pending[user_id] = future
+            if guild.id not in self._flush_tasks:
+                self._flush_tasks[guild.id] = asyncio.create_task(self._flush(guild))
+        return await asyncio.shield(future)
+
+    async def _flush(self, guild: discord.Guild):
+        await asyncio.sleep(self.batch_delay)
+        del self._flush_tasks[guild.id]
+        pending = self._pending.pop(guild.id, {})
+
+        try:
+            user_ids = list(pending)
+            for start in range(0, len(user_ids), QUERY_BATCH_SIZE):
+                chunk = user_ids[start:start + QUERY_BATCH_SIZE]
+                try:
+                    await self._limiter.acquire()
+                    found = {m.id: m for m in await guild.query_members(user_ids=chunk, cache=True)}
+                except Exception as e:
+                    logger.warning(f"Member query failed in {guild.id}, fetching individually: {e}")
+                    results = await gather_bounded(chunk, lambda user_id: self._fetch(guild, user_id), 3)
+                    found = {m.id: m for m in results if isinstance(m, discord.Member)}
+
+                for user_id in chunk:
+                    pending[user_id].set_result(found.get(user_id))
+        finally:
+            # Nobody is left waiting forever, even if the lookup itself was cancelled
+            for future in pending.values():
+                if not future.done():
+                    future.set_result(None)
+
+    async def _fetch(self, guild: discord.Guild, user_id: int) -> discord.Member | None:
+        await self._limiter.acquire()
+        try:
+            return await guild.fetch_member(user_id)
+        except discord.NotFound:
+            return None
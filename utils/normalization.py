@@ -1,28 +1,82 @@
-# import unicodedata
-# import re
-
-
-# def normalize(text: str) -> str:
-#     """
-#     Normalize text for AutoMod:
-#     - Lowercase
-#     - Remove accents / Unicode variants
-#     - Convert leetspeak
-#     - Remove symbols / emojis but keep letters
-#     """
-#     text = text.lower()
-#     text = unicodedata.normalize('NFKD', text).encode(
-#         'ascii', 'ignore').decode('ascii')
-
-#     replacements = {
-#         "4": "a", "@": "a", "3": "e", "1": "i", "!": "i",
-#         "0": "o", "$": "s", "5": "s", "7": "t", "ƒ": "f", "ß": "b", "ç": "c"
-#     }
-
-#     for k, v in replacements.items():
-#         text = text.replace(k, v)
-
-#     # Remove all non-letter/number characters
-#     text = re.sub(r'[^a-z0-9]', '', text)
-
-#     return text
+import unicodedata
+from functools import lru_cache
+
+# Leetspeak and symbol stand-ins, applied after accents are stripped
+LEETSPEAK = {
+    "4": "a", "@": "a", "3": "e", "1": "i", "!": "i",
+    "0": "o", "$": "s", "5": "s", "7": "t", "ƒ": "f", "ß": "b", "ç": "c"
+}
+
+# Letters from other scripts that look like Latin ones, which NFKD leaves alone
+CONFUSABLES = {
+    # Cyrillic
+    "а": "a", "в": "b", "с": "c", "ԁ": "d", "е": "e", "ё": "e", "һ": "h", "н": "h",
+    "і": "i", "ї": "i", "ј": "j", "к": "k", "ӏ": "l", "м": "m", "п": "n", "о": "o",
+    "р": "p", "ԛ": "q", "г": "r", "ѕ": "s", "т": "t", "ц": "u", "ѵ": "v", "ԝ": "w",
+    "х": "x", "у": "y",
+    # Greek
+    "α": "a", "β": "b", "ϲ": "c", "δ": "d", "ε": "e", "η": "n", "ι": "i", "κ": "k",
+    "μ": "u", "ν": "v", "ο": "o", "ρ": "p", "τ": "t", "υ": "u", "χ": "x", "γ": "y",
+    "ω": "w",
+    # Latin letters without a decomposition
+    "ɑ": "a", "ƅ": "b", "ɡ": "g", "ı": "i", "ȷ": "j", "ł": "l", "ø": "o", "đ": "d",
+    "ħ": "h", "ŧ": "t", "æ": "ae", "œ": "oe",
+}
+
+_KEPT = frozenset("abcdefghijklmnopqrstuvwxyz0123456789")
+
+
+def _fold(ch: str) -> str | None:
+    """What one character becomes: lowercased, de-accented, confusables and leetspeak folded, anything else dropped."""
+    out = []
+    for lowered in ch.lower():
+        lowered = CONFUSABLES.get(lowered, lowered)
+        for part in unicodedata.normalize("NFKD", lowered):
+            part = LEETSPEAK.get(part, CONFUSABLES.get(part, part))
+            out.extend(c for c in part if c in _KEPT)
+    return "".join(out) or None
+
+
+class _FoldTable(dict):
+    """str.translate table filled in on first sight of each character, so a message costs a single pass."""
+
+    def __missing__(self, codepoint: int) -> str | None:
+        folded = self[codepoint] = _fold(chr(codepoint))
+        return folded
+
+
+# Joins a batch for one translate call. Mapped to itself, so normalize strips it separately
+_BATCH_SEPARATOR = "\x1f"
+
+_TABLE = _FoldTable({ord(_BATCH_SEPARATOR): _BATCH_SEPARATOR})
+# Seeded up front so everyday text never reaches __missing__
+for _codepoint in range(0x250):
+    _TABLE[_codepoint]
+for _ch in CONFUSABLES:
+    _TABLE[ord(_ch)]
+
+
+@lru_cache(maxsize=4096)
+def normalize(text: str) -> str:
+    """
+    Normalize text for AutoMod in a single pass:
+    - Lowercase
+    - Remove accents / Unicode variants, mapping look-alike letters from other scripts
+    - Convert leetspeak
+    - Remove symbols / emojis but keep letters
+    """
+    folded = text.translate(_TABLE)
+    if _BATCH_SEPARATOR in folded:
+        folded = folded.replace(_BATCH_SEPARATOR, "")
+    return folded
+
+
+def normalize_many(texts: list[str]) -> list[str]:
+    """Normalizes a batch of queued messages with one translate call."""
+    if not texts:
+        return []
+    joined = _BATCH_SEPARATOR.join(texts)
+    if joined.count(_BATCH_SEPARATOR) != len(texts) - 1:
+        # A text carries the separator itself
+        return [normalize(text) for text in texts]
+    return joined.translate(_TABLE).split(_BATCH_SEPARATOR)
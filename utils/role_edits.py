@@ -0,0 +1,140 @@
+import asyncio
+import logging
+
+import discord
+
+from utils.concurrency import RateLimiter
+from utils.member_resolver import MemberResolver
+
+logger = logging.getLogger("morrible")
+
+
+class RoleEditMetrics:
+    """Counts of role toggles received against the role edits actually made."""
+
+    def __init__(self):
+        self.toggles = 0
+        self.edits = 0
+        # Batches whose toggles cancelled out, so no edit was needed
+        self.cancelled = 0
+        self.failed = 0
+
+    @property
+    def saved(self) -> int:
+        """Toggles that did not cost a request of their own."""
+        return self.toggles - self.edits - self.failed
+
+    def summary(self) -> str:
+        return (
+            f"{self.toggles} toggles -> {self.edits} edits ({self.saved} saved, "
+            f"{self.cancelled} batches cancelled out, {self.failed} failed)"
+        )
+
+
+class RoleEditQueue:
+    """
+    Collects role additions and removals per member for `delay` seconds, then applies the
+    member's final desired roles with a single member.edit. A role added and removed again
+    within the window leaves the member untouched.
+
+    Toggles are queued by user ID the moment their event arrives, so they keep the order they
+    happened in; the member itself is only resolved, through `resolver`, when the edit is made.
+    """
+
+    def __init__(
+        self,
+        delay: float = 1.0,
+        reason: str | None = None,
+        limiter: RateLimiter | None = None,
+        resolver: MemberResolver | None = None
+    ):
+        self.delay = delay
+        self.reason = reason
+        self.limiter = limiter
+        self.resolver = resolver or MemberResolver()
+        self.metrics = RoleEditMetrics()
+        # (guild_id, user_id) -> role_id -> whether the member should end up with it
+        self._pending: dict[tuple[int, int], dict[int, bool]] = {}
+        # (guild_id, user_id) -> the guild and, when an event carried one, the member
+        self._targets: dict[tuple[int, int], tuple[discord.Guild, discord.Member | None]] = {}
+        self._timers: dict[tuple[int, int], asyncio.Task] = {}
+
+    def add(self, guild: discord.Guild, user_id: int, role_id: int, member: discord.Member | None = None):
+        self._queue(guild, user_id, role_id, True, member)
+
+    def remove(self, guild: discord.Guild, user_id: int, role_id: int, member: discord.Member | None = None):
+        self._queue(guild, user_id, role_id, False, member)
+
+    def _queue(self, guild: discord.Guild, user_id: int, role_id: int, wanted: bool, member: discord.Member | None):
+        key = (guild.id, user_id)
+        self.metrics.toggles += 1
+        self._pending.setdefault(key, {})[role_id] = wanted
+        if member is not None or key not in self._targets:
+            self._targets[key] = (guild, member)
+        if key not in self._timers:
+            self._timers[key] = asyncio.create_task(self._apply_later(key))
+
+    async def _apply_later(self, key: tuple[int, int]):
+        await asyncio.sleep(self.delay)
+        try:
+            await self._apply(key)
+        finally:
+            # Holding the timer until the edit is made keeps a member's batches in order; toggles
+            # that came in meanwhile start the next window
+            self._timers.pop(key, None)
+            if key in self._pending:
+                self._timers[key] = asyncio.create_task(self._apply_later(key))
+
+    async def _apply(self, key: tuple[int, int]):
+        changes = self._pending.pop(key, {})
+        guild, member = self._targets.pop(key, (None, None))
+        if not changes or guild is None:
+            return
+        member = await self.resolver.resolve(guild, key[1], member)
+        # Members who left, and bots, are left alone
+        if member is not None and not member.bot:
+            try:
+                await self.apply_changes(member, changes)
+            except discord.HTTPException:
+                pass  # Already counted and logged
+
+    async def apply_changes(self, member: discord.Member, changes: dict[int, bool], reason: str | None = None) -> bool:
+        """
+        Gives or takes the roles in `changes` (role_id -> wanted) with one edit, skipping it when nothing
+        would change. Returns whether an edit was made; a failed edit is logged and raised.
+        """
+        # Prefer the cached member, whose roles reflect every update since the toggles were queued
+        member = member.guild.get_member(member.id) or member
+        current = {role.id for role in member.roles if not role.is_default()}
+        desired = set(current)
+        for role_id, wanted in changes.items():
+            if wanted:
+                desired.add(role_id)
+            else:
+                desired.discard(role_id)
+
+        if desired == current:
+            self.metrics.cancelled += 1
+            return False
+
+        roles = [role for role in (member.guild.get_role(role_id) for role_id in desired) if role]
+        if self.limiter:
+            await self.limiter.acquire()
+        try:
+            await member.edit(roles=roles, reason=reason or self.reason)
+            self.metrics.edits += 1
+        except discord.HTTPException as e:
+            self.metrics.failed += 1
+            logger.warning(f"Failed to update roles for {member.id} in {member.guild.id}: {e}")
+            raise
+        finally:
+            logger.debug("Role edits: %s", self.metrics.summary())
+        return True
+
+    async def flush(self):
+        """Applies every pending change now instead of waiting out the window."""
+        for timer in self._timers.values():
+            timer.cancel()
+        self._timers.clear()
+        for key in list(self._pending):
+            await self._apply(key)
@@ -0,0 +1,304 @@
+import re
+import datetime
+from functools import lru_cache
+from typing import NamedTuple
+
+DAY_MAP = {
+    "monday": 0, "mon": 0,
+    "tuesday": 1, "tue": 1, "tues": 1,
+    "wednesday": 2, "wed": 2,
+    "thursday": 3, "thu": 3, "thur": 3, "thurs": 3,
+    "friday": 4, "fri": 4,
+    "saturday": 5, "sat": 5,
+    "sunday": 6, "sun": 6
+}
+
+UNIT_SECONDS = {"s": 1, "m": 60, "h": 3600, "d": 86400, "w": 604800}
+
+# The grammar's only pattern. One pass splits the input into numbers, words, whitespace runs and single
+# punctuation characters; every rule below reads those tokens instead of matching the text again.
+_TOKEN = re.compile(r"\d+|[a-z]+|\s+|.", re.DOTALL)
+
+_LIST_SEPARATORS = {",", ";", "&"}
+_ALL_DAYS = [0, 1, 2, 3, 4, 5, 6]
+_DAYS_BY_WORD = {
+    "everyday": _ALL_DAYS, "daily": _ALL_DAYS, "day": _ALL_DAYS, "days": _ALL_DAYS,
+    "weekday": [0, 1, 2, 3, 4], "weekdays": [0, 1, 2, 3, 4],
+    "weekend": [5, 6], "weekends": [5, 6],
+}
+
+_SHORT_DAY_NAMES = {0: "Mon", 1: "Tue", 2: "Wed", 3: "Thu", 4: "Fri", 5: "Sat", 6: "Sun"}
+
+Tokens = tuple[str, ...]
+
+
+@lru_cache(maxsize=1024)
+def tokenize(clean: str) -> Tokens:
+    """Splits normalised text into tokens, e.g. 'mon at 3:30pm' -> ('mon', ' ', 'at', ' ', '3', ':', '30', 'pm')."""
+    return tuple(_TOKEN.findall(clean))
+
+
+def _is_number(token: str) -> bool:
+    return token[0].isdecimal()
+
+
+def _is_space(token: str) -> bool:
+    return token[0].isspace()
+
+
+def _duration(tokens: Tokens) -> int | None:
+    """<number><unit> pairs, each optionally followed by whitespace, and nothing else."""
+    total_seconds, i = 0, 0
+    while i < len(tokens):
+        if i + 1 == len(tokens) or not _is_number(tokens[i]) or tokens[i + 1] not in UNIT_SECONDS:
+            return None
+        total_seconds += int(tokens[i]) * UNIT_SECONDS[tokens[i + 1]]
+        i += 2
+        if i < len(tokens) and _is_space(tokens[i]):
+            i += 1
+    return total_seconds if tokens else None
+
+
+def _loose_duration(tokens: Tokens) -> int | None:
+    """Every number directly followed by a word starting with a unit, whatever surrounds them."""
+    parts = [
+        int(number) * UNIT_SECONDS[word[0]]
+        for number, word in zip(tokens, tokens[1:])
+        if word[0] in UNIT_SECONDS and _is_number(number)
+    ]
+    return sum(parts) if parts else None
+
+
+def _time(tokens: Tokens) -> datetime.time | None:
+    if not tokens or tokens[-1] not in ("am", "pm"):
+        return _clock(tokens)
+
+    # 12-hour format: 3pm, 3:30pm, 10am, 10:45am
+    digits = tokens[:-1]
+    if digits and _is_space(digits[-1]):
+        digits = digits[:-1]
+    if len(digits) == 1:
+        minute = 0
+    elif len(digits) == 3 and digits[1] == ":" and len(digits[2]) == 2 and _is_number(digits[2]):
+        minute = int(digits[2])
+    else:
+        return None
+    if len(digits[0]) > 2 or not _is_number(digits[0]):
+        return None
+    hour = int(digits[0])
+
+    if hour < 1 or hour > 12 or minute < 0 or minute > 59:
+        return None
+
+    if tokens[-1] == "pm" and hour < 12:
+        hour += 12
+    elif tokens[-1] == "am" and hour == 12:
+        hour = 0
+
+    return datetime.time(hour=hour, minute=minute)
+
+
+def _clock(tokens: Tokens) -> datetime.time | None:
+    """24-hour format: 15:30, 09:00, 9:00, 9:05:30"""
+    if len(tokens) not in (3, 5) or len(tokens[0]) > 2 or not _is_number(tokens[0]):
+        return None
+    for colon, number in zip(tokens[1::2], tokens[2::2]):
+        if colon != ":" or len(number) != 2 or not _is_number(number):
+            return None
+    hour = int(tokens[0])
+    minute = int(tokens[2])
+    second = int(tokens[4]) if len(tokens) == 5 else 0
+    if 0 <= hour <= 23 and 0 <= minute <= 59 and 0 <= second <= 59:
+        return datetime.time(hour=hour, minute=minute, second=second)
+    return None
+
+
+def _conjunction_parts(text: str) -> list[str]:
+    """Splits on every 'and' and 'or', even inside a word, as day lists always have been."""
+    parts, start, i = [], 0, 0
+    while i < len(text):
+        width = 3 if text.startswith("and", i) else 2 if text.startswith("or", i) else 0
+        if width:
+            parts.append(text[start:i])
+            start = i = i + width
+        else:
+            i += 1
+    parts.append(text[start:])
+    return parts
+
+
+def _days(tokens: Tokens) -> list[int] | None:
+    if len(tokens) == 1 and tokens[0] in _DAYS_BY_WORD:
+        return list(_DAYS_BY_WORD[tokens[0]])
+
+    # Whitespace and separators split the list, then 'and' and 'or' split what is between them
+    found_days, piece = set(), ""
+    for token in tokens + (" ",):
+        if _is_space(token) or token in _LIST_SEPARATORS:
+            found_days.update(DAY_MAP[part] for part in _conjunction_parts(piece) if part in DAY_MAP)
+            piece = ""
+        else:
+            piece += token
+    return sorted(found_days) if found_days else None
+
+
+def _split_at(tokens: Tokens) -> tuple[Tokens, Tokens] | None:
+    """The tokens before and after the first ' at ', without the whitespace around it."""
+    for i in range(1, len(tokens) - 1):
+        if tokens[i] == "at" and tokens[i - 1].endswith(" ") and tokens[i + 1].startswith(" "):
+            return tokens[:i - 1], tokens[i + 2:]
+    return None
+
+
+@lru_cache(maxsize=1024)
+def _duration_seconds(clean: str) -> int | None:
+    return _duration(tokenize(clean))
+
+
+def parse_duration_to_seconds(duration_str: str, allow_zero: bool = False) -> int | None:
+    """Parses a duration string (e.g., 1h30m, 10m, 2d) into total seconds. Zero is rejected unless `allow_zero`."""
+    total_seconds = _duration_seconds(duration_str.strip().lower())
+    if total_seconds is None or (total_seconds == 0 and not allow_zero):
+        return None
+    return total_seconds
+
+
+@lru_cache(maxsize=1024)
+def _loose_duration_seconds(clean: str) -> int | None:
+    return _loose_duration(tokenize(clean))
+
+
+def parse_loose_duration_to_seconds(duration_str: str) -> int | None:
+    """
+    Reads every <number><unit> in the string and ignores the rest, so "30min", "1hr", "2hours" and "1h 30"
+    parse as moderators have always typed them. Zero is allowed.
+    """
+    return _loose_duration_seconds(duration_str.strip().lower())
+
+
+@lru_cache(maxsize=256)
+def _time_of_day(clean_str: str) -> datetime.time | None:
+    return _time(tokenize(clean_str))
+
+
+def parse_time_of_day(time_str: str) -> datetime.time | None:
+    """Parses time strings like '10:00', '10am', '3:30pm', '17:00'."""
+    return _time_of_day(time_str.strip().lower())
+
+
+def parse_days_list(days_str: str) -> list[int] | None:
+    """Parses a string containing days like 'monday and wednesday', 'weekdays', 'sat, sun'."""
+    return _days(tokenize(days_str.lower().strip()))
+
+
+class ScheduleSpec(NamedTuple):
+    """
+    A parsed schedule, independent of the current time.
+    `kind` is one of "interval", "weekly", "duration", "relative_day", "weekday" or "date".
+    """
+    kind: str
+    text: str = ""
+    seconds: int = 0
+    days: tuple[int, ...] = ()
+    time: datetime.time | None = None
+    date: datetime.date | None = None
+    # For "relative_day": 0 for today, 1 for tomorrow
+    day_offset: int = 0
+
+
+def _trailing_time(tokens: Tokens) -> datetime.time | None:
+    """The time of day after ' at ' or as the last word, defaulting to 9am."""
+    split = _split_at(tokens)
+    if split:
+        return _time(split[1])
+    for i in range(len(tokens) - 1, 0, -1):
+        if _is_space(tokens[i]):
+            return _time(tokens[i + 1:])
+    return datetime.time(9)
+
+
+def _repeat_body(tokens: Tokens) -> Tokens | None:
+    """What follows 'every ' or 'repeat ' (or the 'every' of 'everyday'), or the whole of 'daily ...'."""
+    first = tokens[0]
+    if first in ("every", "repeat") and len(tokens) > 1 and tokens[1].startswith(" "):
+        body = tokens[2:]
+    elif first.startswith("everyday"):
+        body = (first[len("every"):],) + tokens[1:]
+    elif first.startswith("daily"):
+        body = tokens
+    else:
+        return None
+    return ("everyday",) if body in (("day",), ("days",)) else body
+
+
+@lru_cache(maxsize=512)
+def _parse_schedule(raw: str) -> ScheduleSpec | None:
+    tokens = tokenize(raw)
+    if not tokens:
+        return None
+
+    # Repeating: "every 10m", "every monday at 10am", "daily at 9am"
+    body = _repeat_body(tokens)
+    if body:
+        interval_sec = _duration(body)
+        if interval_sec:
+            return ScheduleSpec("interval", text="".join(body), seconds=interval_sec)
+
+        days_part, time_part = _split_at(body) or (body, None)
+        days_list = _days(days_part)
+        parsed_time = _time(time_part) if time_part is not None else datetime.time(9)
+        if days_list and parsed_time:
+            if len(days_list) == 7:
+                days_desc = "day"
+            elif days_list == [0, 1, 2, 3, 4]:
+                days_desc = "weekday"
+            elif days_list == [5, 6]:
+                days_desc = "weekend day"
+            else:
+                days_desc = ", ".join(_SHORT_DAY_NAMES[d] for d in days_list)
+            time_desc = parsed_time.strftime("%I:%M %p").lstrip("0")
+            return ScheduleSpec("weekly", text=f"every {days_desc} at {time_desc}", days=tuple(days_list), time=parsed_time)
+
+    # Relative duration: "10m", "2h", "1d12h"
+    dur_sec = _duration(tokens)
+    if dur_sec:
+        return ScheduleSpec("duration", text=raw, seconds=dur_sec)
+
+    # "tomorrow at 3pm", "today at 8pm" (both only ever occur inside a single word token)
+    if "tomorrow" in raw or "today" in raw:
+        parsed_t = _trailing_time(tokens)
+        if parsed_t:
+            return ScheduleSpec("relative_day", text=raw, time=parsed_t, day_offset=0 if "today" in raw else 1)
+
+    # "monday at 10am", "next friday 5pm"; every day name starts with its three-letter one
+    day_word = tokens[2] if tokens[0] == "next" and len(tokens) > 2 and tokens[1] == " " else tokens[0]
+    day_num = DAY_MAP.get(day_word[:3])
+    if day_num is not None:
+        parsed_t = _trailing_time(tokens)
+        if parsed_t:
+            return ScheduleSpec("weekday", text=raw, days=(day_num,), time=parsed_t)
+
+    # "2026-08-01 15:30"
+    if len(tokens) >= 5 and tokens[1] == tokens[3] == "-":
+        year, month, day = tokens[0:5:2]
+        if not (len(year) == 4 and len(month) == len(day) == 2 and all(map(_is_number, (year, month, day)))):
+            return None
+        if len(tokens) == 5:
+            p_time = datetime.time(9)
+        elif _is_space(tokens[5]):
+            p_time = _clock(tokens[6:])
+        else:
+            return None
+        try:
+            date = datetime.date(int(year), int(month), int(day))
+        except ValueError:
+            return None
+        if p_time:
+            return ScheduleSpec("date", text=raw, date=date, time=p_time)
+
+    return None
+
+
+def parse_schedule(text: str) -> ScheduleSpec | None:
+    """Parses schedule text into a time-independent spec. Results are cached by normalised input."""
+    return _parse_schedule(text.strip().lower())
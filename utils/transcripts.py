@@ -0,0 +1,164 @@
+import asyncio
+import gzip
+import json
+import logging
+import os
+from typing import NamedTuple
+
+import discord
+
+logger = logging.getLogger("morrible")
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+TRANSCRIPT_DIR = os.path.join(BASE_DIR, "transcripts")
+
+# Messages buffered before each write, matching the page size thread.history fetches
+PAGE_SIZE = 100
+
+# Headroom left under the upload limit for the rest of the request
+UPLOAD_MARGIN = 64 * 1024
+
+
+class Transcript(NamedTuple):
+    """A thread archived to disk: the full JSONL record and its readable text, split into uploadable parts."""
+    jsonl_path: str
+    text_paths: list[str]
+    message_count: int
+
+
+def message_record(message: discord.Message) -> dict:
+    return {
+        "id": message.id,
+        "author_id": message.author.id,
+        "author": str(message.author),
+        "created_at": message.created_at.isoformat(),
+        "edited_at": message.edited_at.isoformat() if message.edited_at else None,
+        "content": message.content,
+        "attachments": [attachment.url for attachment in message.attachments],
+        "embeds": len(message.embeds),
+        "reply_to": message.reference.message_id if message.reference else None,
+    }
+
+
+def message_text(record: dict) -> str:
+    created = record["created_at"][:19].replace("T", " ")
+    lines = [f"[{created} UTC] {record['author']} ({record['author_id']}): {record['content']}"]
+    lines.extend(f"    attachment: {url}" for url in record["attachments"])
+    if record["embeds"]:
+        lines.append(f"    ({record['embeds']} embed{'s' if record['embeds'] != 1 else ''})")
+    return "\n".join(lines) + "\n"
+
+
+class _TranscriptWriter:
+    """Appends pages of records to the JSONL archive and to text parts no larger than `part_size` bytes."""
+
+    def __init__(self, stem: str, part_size: int):
+        self.stem = stem
+        self.part_size = part_size
+        self.jsonl_path = f"{stem}.jsonl.gz"
+        self.text_paths: list[str] = []
+        self._jsonl = gzip.open(self.jsonl_path, "wt", encoding="utf-8")
+        self._text = None
+        self._text_size = 0
+
+    def write_page(self, records: list[dict]):
+        for record in records:
+            self._jsonl.write(json.dumps(record, ensure_ascii=False) + "\n")
+            chunk = message_text(record).encode("utf-8")
+            if self._text is None or (self._text_size and self._text_size + len(chunk) > self.part_size):
+                self._next_part()
+            self._text.write(chunk)
+            self._text_size += len(chunk)
+
+    def _next_part(self):
+        if self._text:
+            self._text.close()
+        path = f"{self.stem}.part{len(self.text_paths) + 1}.txt"
+        self.text_paths.append(path)
+        self._text = open(path, "wb")
+        self._text_size = 0
+
+    def close(self):
+        self._jsonl.close()
+        if self._text:
+            self._text.close()
+
+
+async def archive_thread(thread: discord.Thread, name: str, part_size: int) -> Transcript:
+    """
+    Streams the thread's history, oldest first, into `<name>.jsonl.gz` and `<name>.partN.txt` files under
+    TRANSCRIPT_DIR/<guild_id>. Only one page of messages is held in memory at a time, and file writes run
+    off the event loop.
+    """
+    directory = os.path.join(TRANSCRIPT_DIR, str(thread.guild.id))
+    await asyncio.to_thread(os.makedirs, directory, exist_ok=True)
+    writer = await asyncio.to_thread(_TranscriptWriter, os.path.join(directory, name), part_size)
+
+    count = 0
+    page: list[dict] = []
+    try:
+        async for message in thread.history(limit=None, oldest_first=True):
+            page.append(message_record(message))
+            if len(page) >= PAGE_SIZE:
+                await asyncio.to_thread(writer.write_page, page)
+                count += len(page)
+                page = []
+        if page:
+            await asyncio.to_thread(writer.write_page, page)
+            count += len(page)
+    finally:
+        await asyncio.to_thread(writer.close)
+
+    return Transcript(writer.jsonl_path, writer.text_paths, count)
+
+
+def upload_part_size(guild: discord.Guild) -> int:
+    return guild.filesize_limit - UPLOAD_MARGIN
+
+
+async def upload_transcript(channel: discord.TextChannel, transcript: Transcript, title: str):
+    """Posts each text part, one per message so every request stays under the upload limit, then the JSONL archive if it fits."""
+    total = len(transcript.text_paths)
+    for number, path in enumerate(transcript.text_paths, 1):
+        label = f"{title} ({number}/{total})" if total > 1 else title
+        await channel.send(label, file=discord.File(path, filename=os.path.basename(path)))
+
+    size = await asyncio.to_thread(os.path.getsize, transcript.jsonl_path)
+    if size <= upload_part_size(channel.guild):
+        await channel.send(file=discord.File(transcript.jsonl_path, filename=os.path.basename(transcript.jsonl_path)))
+
+
+async def archive_and_delete(
+    thread: discord.Thread, name: str, log_channel: discord.TextChannel | None, title: str
+) -> Transcript | None:
+    """
+    Locks a closed ticket thread, archives its transcript, posts it to `log_channel` and deletes the thread.
+    If the transcript can't be written the thread is left locked and archived rather than deleted.
+    """
+    try:
+        # Nothing more can be said while the history is being read
+        await thread.edit(locked=True)
+    except discord.HTTPException:
+        pass
+
+    try:
+        transcript = await archive_thread(thread, name, upload_part_size(thread.guild))
+    except Exception as e:
+        logger.error(f"Failed to archive transcript of {thread.id}, keeping the thread: {e}")
+        try:
+            await thread.edit(archived=True, locked=True)
+        except discord.HTTPException:
+            pass
+        return None
+
+    if log_channel:
+        try:
+            await upload_transcript(log_channel, transcript, f"{title} ({transcript.message_count} messages)")
+        except (discord.HTTPException, OSError) as e:
+            logger.warning(f"Failed to upload transcript of {thread.id}, it remains at {transcript.jsonl_path}: {e}")
+
+    try:
+        await thread.delete()
+    except discord.HTTPException as e:
+        logger.warning(f"Failed to delete ticket thread {thread.id}: {e}")
+    return transcript